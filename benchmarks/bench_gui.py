@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from PyQt5 import QtCore
+
+from benchmarks.common import application, synthetic_events, by_month, summary, write_results, print_table
+
+from theatre.TheatreModel import Shedule, Event
+
+# numbers of events in a season
+SEASON_SIZES = (100, 1000, 10000)
+
+def season_database(filename, size):
+
+    """
+    Creates a shedule database with a season of events.
+    Returns keys of its months.
+
+    """
+    today = datetime.now()
+    events = synthetic_events(size, datetime(today.year, today.month, 1))
+    shedule = Shedule(filename)
+    months = by_month(events)
+    for key, month_events in months.items():
+        shedule.storage.write(key, month_events)
+    shedule.close()
+    return sorted(months)
+
+
+
+class Harness:
+
+    """
+    Drives the main window and measures how long actions take
+    until all events caused by them are processed.
+
+    """
+    def __init__(self, window):
+        self.window = window
+        self.app = application(widgets=True)
+        self.samples = {} # a name of the action -> durations
+
+    def run(self, name, action):
+
+        """
+        Performs the action and remembers its latency.
+
+        """
+        started = time.perf_counter()
+        action()
+        # queued signals and painting are parts of the latency
+        self.app.processEvents()
+        self.samples.setdefault(name, []).append(time.perf_counter() - started)
+
+    def navigate(self, months, rounds):
+
+        """
+        Walks over the season forward and back.
+
+        """
+        for _ in range(rounds):
+            for _ in range(months - 1):
+                self.run('next_month', self.window.on_next_clicked)
+            for _ in range(months - 1):
+                self.run('prev_month', self.window.on_prev_clicked)
+            self.run('actual_month', self.window.set_actual_month)
+
+    def select_nearest(self, rounds):
+
+        """
+        Sets the current month to the table, the nearest
+        event is selected.
+
+        """
+        other = self.window.shedule.get_next()
+        model = self.window.shedule.get_actual()
+        for _ in range(rounds):
+            # the view ignores the model it already has
+            self.window.table.setModel(other)
+            self.run('set_model_nearest', lambda: self.window.table.setModel(model))
+
+    def reload(self, rounds):
+
+        """
+        Loads the saved month again.
+
+        """
+        self.window.set_actual_month()
+        for _ in range(rounds):
+            self.run('load', self.window.on_load_clicked)
+
+    def edit(self, rounds):
+
+        """
+        Adds and edits events through model methods,
+        the same way the edit dialog does.
+
+        """
+        self.window.set_actual_month()
+        model = self.window.table.model()
+        start = self.window.shedule.get_actual().date
+        for number in range(rounds):
+            date = start + timedelta(days=number % 28, hours=21, minutes=number)
+            self.run('add_event', lambda: model.add(Event(date, 'Added', 'Someone')))
+            row = model.nearest_row(date)
+            self.run('edit_event', lambda: model.replace(row, Event(date, 'Edited', 'Someone else')))
+
+def bench_season(directory, size, rounds):
+
+    """
+    Measures actions on a season of size events.
+    Returns a dictionary a name of the action -> statistics.
+
+    """
+    from theatre.MainWindow import MainWindow
+    filename = os.path.join(directory, 'season{}'.format(size))
+    months = season_database(filename, size)
+    shedule = Shedule(filename)
+    application(widgets=True)
+    window = MainWindow(shedule)
+    window.show()
+    harness = Harness(window)
+    try:
+        harness.app.processEvents()
+        harness.navigate(len(months), rounds)
+        harness.select_nearest(rounds)
+        # reload before edits, reloading a changed month asks a question
+        harness.reload(rounds)
+        harness.edit(rounds)
+    finally:
+        # the window must be destroyed before models of the shedule
+        window.hide()
+        window.deleteLater()
+        QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+        shedule.close()
+    return {name: summary(samples) for name, samples in harness.samples.items()}
+
+def main(argv=None):
+
+    """
+    Runs the GUI benchmark and prints a report.
+
+    """
+    parser = argparse.ArgumentParser(description='Measure latencies of the main window actions offscreen')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SEASON_SIZES, help='numbers of events in a season')
+    parser.add_argument('--rounds', type=int, default=10, help='repetitions of each action')
+    parser.add_argument('--json', help='write results to the file')
+    args = parser.parse_args(argv)
+
+    application(widgets=True)
+    directory = tempfile.mkdtemp(prefix='theatre-bench-')
+    results = []
+    try:
+        for size in args.sizes:
+            actions = bench_season(directory, size, args.rounds)
+            for name, stats in actions.items():
+                results.append(dict(stats, events=size, action=name))
+    finally:
+        shutil.rmtree(directory)
+
+    print_table(results, ('events', 'action', 'p50', 'p99', 'max', 'runs'))
+    write_results('gui', results, args.json)
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
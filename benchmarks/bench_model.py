@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import application, season_dates, synthetic_events, measure, summary, \
+                              write_results, print_table
+from benchmarks.bench_sync import changed_season
+
+from theatre.TheatreModel import Storage, Month, SortProxyModel, Shedule, Event
+
+# numbers of events in a month
+MONTH_SIZES = (10, 100, 1000)
+# parts of a month changed on the website, percents
+DIFF_PARTS = (1, 10, 50)
+# months in the database for cache misses
+SEASON_MONTHS = 12
+
+def next_month():
+
+    """
+    Returns the first day of the next month,
+    its events are not in the past.
+
+    """
+    today = datetime.now()
+    return (datetime(today.year, today.month, 1) + timedelta(days=32)).replace(day=1)
+
+def month_events(count, start):
+
+    """
+    Returns count synced events of the month.
+
+    """
+    events = synthetic_events(count, start)
+    # fit all events in the month
+    return [Event(date, event.title, event.people, event.hash)
+            for date, event in zip(season_dates(count, start, days=28), events)]
+
+def timed_runs(prepare, func, repeat):
+
+    """
+    Like measure, but prepare is called before each run
+    and is not measured. func gets its result.
+
+    """
+    samples = []
+    for _ in range(repeat):
+        data = prepare()
+        started = time.perf_counter()
+        func(data)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def bench_month(storage, start, count, repeat):
+
+    """
+    Measures a month of count events. Returns a dictionary
+    a name of the case -> statistics.
+
+    """
+    events = month_events(count, start)
+    key = start.strftime('%Y%m')
+    storage.write(key, events)
+    loaded = lambda: Month(start, storage)
+    proxy = lambda: SortProxyModel(Month(start, storage))
+    extra = [Event(event.date + timedelta(minutes=5), 'Extra', None, None) for event in events[:20]]
+    results = {}
+
+    # storage and loading
+    results['load'] = summary(measure(lambda: Month(start, storage).fetch_all(), repeat))
+
+    def save(month):
+        month.changed = True
+        month.save()
+    results['save'] = summary(timed_runs(loaded, save, repeat))
+
+    # iteration creates an Event for each row
+    results['iterate_month'] = summary(timed_runs(loaded, list, repeat))
+    results['iterate_proxy'] = summary(timed_runs(proxy, list, repeat))
+
+    # editing through the proxy, each operation re-sorts events
+    def add(model):
+        for event in extra:
+            model.add(event)
+    results['proxy_add_20'] = summary(timed_runs(proxy, add, repeat))
+
+    def replace(model):
+        model.fetch_all()
+        for event in extra:
+            model.replace(0, event)
+    results['proxy_replace_20'] = summary(timed_runs(proxy, replace, repeat))
+
+    def sort(model):
+        model.fetch_all()
+        model.sort(0, 1) # descending
+        model.sort(0, 0) # and back
+    results['proxy_sort'] = summary(timed_runs(proxy, sort, repeat))
+
+    # merges of sync results
+    for part in DIFF_PARTS:
+        update = changed_season(events, max(1, 100 // part))
+        results['update_{}%'.format(part)] = summary(
+                timed_runs(loaded, lambda month: month.update(update), repeat))
+    storage.write(key, events) # undo saved changes
+    return results
+
+def bench_cache_misses(directory, start, count, repeat):
+
+    """
+    Measures Shedule.get_month for months not in the cache.
+
+    """
+    filename = os.path.join(directory, 'season')
+    shedule = Shedule(filename)
+    keys = []
+    for number in range(SEASON_MONTHS):
+        date = (start + timedelta(days=31 * number)).replace(day=1)
+        keys.append(date.strftime('%Y%m'))
+        shedule.storage.write(keys[-1], month_events(count, date))
+
+    def miss_all():
+        shedule.cache.clear()
+        for key in keys:
+            shedule.get_month(key=key)
+
+    samples = [sample / len(keys) for sample in measure(miss_all, repeat)]
+    shedule.close()
+    return summary(samples)
+
+def compare(old, new):
+
+    """
+    Prints p50 of cases of the old and new results.
+
+    """
+    rows = []
+    old_results = {row['events']: row['cases'] for row in old['results']}
+    for row in new['results']:
+        for case, stats in row['cases'].items():
+            before = old_results.get(row['events'], {}).get(case)
+            if before is None:
+                continue
+            rows.append({'events': row['events'], 'case': case, 'old_p50': before['p50'],
+                         'new_p50': stats['p50'], 'ratio': stats['p50'] / before['p50']})
+    print('\nCompared with {} ({})'.format(old.get('commit'), old.get('date')))
+    print_table(rows, ('events', 'case', 'old_p50', 'new_p50', 'ratio'))
+
+def main(argv=None):
+
+    """
+    Runs the model benchmark and prints a report.
+
+    """
+    parser = argparse.ArgumentParser(description='Benchmark models and the storage with synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=MONTH_SIZES, help='numbers of events in a month')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each measurement')
+    parser.add_argument('--json', help='write results to the file')
+    parser.add_argument('--compare', help='compare with results written earlier')
+    args = parser.parse_args(argv)
+
+    application()
+    start = next_month()
+    directory = tempfile.mkdtemp(prefix='theatre-bench-')
+    results = []
+    try:
+        for size in args.sizes:
+            storage = Storage(os.path.join(directory, 'month{}'.format(size)))
+            cases = bench_month(storage, start, size, args.repeat)
+            storage.close()
+            cases['get_month_miss'] = bench_cache_misses(directory, start, size, args.repeat)
+            results.append({'events': size, 'cases': cases})
+    finally:
+        shutil.rmtree(directory)
+
+    rows = [dict({'case': case}, **{str(row['events']): row['cases'][case]['p50'] for row in results})
+            for case in results[0]['cases']]
+    print('p50, ms')
+    print_table(rows, ['case'] + [str(size) for size in args.sizes])
+    document = write_results('model', results, args.json)
+    if args.compare:
+        with open(args.compare, 'r') as old:
+            compare(json.load(old), document)
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import hashlib
+import html
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.common import SIZES, application, synthetic_events, by_month, measure, summary, \
+                              write_results, print_table
+
+from theatre.TheatreModel import Storage, Month, Event
+from theatre.Website import Parser, Synchronizer
+
+# genitive names of months used by the website
+MONTH_NAMES = {number: name for name, number in Parser.month_names.items()}
+WEEKDAYS = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс')
+
+ARTICLE_TEMPLATE = '''<article class="post">
+<span>{weekday} {time}</span><span>{day}</span><span>{month}</span>
+<p>{weekday}</p><p>{day} {month}</p><p><a href="/rus/show/{number}">{title}</a></p>
+</article>
+'''
+
+# fixture pages of the shedule in the markup of the website,
+# a file start-N.html is the page at the offset N. Unlike synthetic
+# pages they have the layout around articles, extra spans, links
+# without text and an article without a date
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+PAGER_TEMPLATE = '<div class="pager"><a href="/rus/?start={start}" title="Вперёд">Вперёд</a></div>'
+
+def render_page(events, first, forward):
+
+    """
+    Returns a page of the shedule with events in the markup
+    of the website and a link to the next page if forward is given.
+
+    """
+    articles = []
+    for number, event in enumerate(events, first):
+        articles.append(ARTICLE_TEMPLATE.format(weekday=WEEKDAYS[event.date.weekday()],
+                                                time=event.date.strftime('%H:%M'),
+                                                day=event.date.day,
+                                                month=MONTH_NAMES[event.date.month].upper(),
+                                                number=number,
+                                                title=html.escape(event.title)))
+    pager = PAGER_TEMPLATE.format(start=forward) if forward is not None else ''
+    return '<html><body>\n{}{}\n</body></html>'.format(''.join(articles), pager)
+
+def render_pages(events, per_page=10):
+
+    """
+    Returns a dictionary url -> a page of the shedule with events.
+
+    """
+    pages = {}
+    for start in range(0, max(len(events), 1), per_page):
+        forward = start + per_page if start + per_page < len(events) else None
+        pages[Synchronizer.url.format(start)] = render_page(events[start:start + per_page], start, forward)
+    return pages
+
+def fixture_pages(directory=FIXTURES_DIR):
+
+    """
+    Returns fixture pages of the shedule in order of offsets.
+
+    """
+    offsets = sorted(int(filename[6:-5]) for filename in os.listdir(directory)
+                     if filename.startswith('start-') and filename.endswith('.html'))
+    pages = {}
+    for offset in offsets:
+        with open(os.path.join(directory, 'start-{}.html'.format(offset)), 'r', encoding='utf-8') as page:
+            pages[Synchronizer.url.format(offset)] = page.read()
+    return pages
+
+def parsed_events(pages):
+
+    """
+    Returns events of the pages sorted by dates.
+
+    """
+    synchronizer = Synchronizer()
+    for text in pages.values():
+        synchronizer.collect(Parser(text))
+    events = [event for month in synchronizer.events.values() for event in month]
+    return sorted(events, key=lambda event: event.date)
+
+def recorded_pages(directory):
+
+    """
+    Returns pages of the latest sync saved in the page archive.
+
+    """
+    from theatre.Archive import PageArchive
+    archive = PageArchive(directory)
+    syncs = archive.syncs()
+    if not syncs:
+        raise SystemExit('There are no archived pages in ' + directory)
+    return {record['url']: archive.get(record['page']) for record in syncs[max(syncs)]['pages']}
+
+
+
+class StandInServer:
+
+    """
+    Serves pages of the shedule from memory on a local port.
+    Use it as a context manager, the host is in self.host.
+
+    """
+    def __init__(self, pages):
+        pages = {url: text.encode('utf-8') for url, text in pages.items()}
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = pages.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass # do not spoil the report
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.host = '{}:{}'.format(*self.server.server_address)
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+def bench_sync(pages, host, repeat):
+
+    """
+    Measures full syncs from the stand-in server.
+
+    """
+    samples = measure(lambda: Synchronizer(host=host).run(), repeat)
+    result = summary(samples)
+    result['pages_per_second'] = len(pages) / (result['p50'] / 1000)
+    return result
+
+def bench_parse(pages, repeat):
+
+    """
+    Measures parsing of pages without the network.
+
+    """
+    texts = list(pages.values())
+    samples = measure(lambda: [Parser(text).parse() for text in texts], repeat)
+    result = summary(samples)
+    result['per_page'] = result['p50'] / len(texts)
+    return result
+
+def bench_hashing(pages, repeat):
+
+    """
+    Measures hashsums of parsed events.
+
+    """
+    raw_events = [raw_event for text in pages.values() for raw_event in Parser(text).parse()]
+
+    def hash_all():
+        for raw_event in raw_events:
+            hashlib.md5((raw_event[1].strftime('%Y.%m.%d %H:%M') + raw_event[2]).encode()).digest()
+
+    result = summary(measure(hash_all, repeat))
+    result['events'] = len(raw_events)
+    return result
+
+def changed_season(events, part=10):
+
+    """
+    Returns events of the synced season where every part-th event
+    has been renamed on the website.
+
+    """
+    update = []
+    for number, event in enumerate(events):
+        if number % part == 0:
+            title = event.title + ' (new)'
+            hashsum = hashlib.md5((event.date.strftime('%Y.%m.%d %H:%M') + title).encode()).digest()
+            event = Event(event.date, title, None, hashsum)
+        update.append(event)
+    return update
+
+def bench_merge(events, repeat):
+
+    """
+    Measures Month.update of all months of the season
+    when a tenth of events has been changed.
+
+    """
+    directory = tempfile.mkdtemp(prefix='theatre-bench-')
+    try:
+        storage = Storage(os.path.join(directory, 'shedule'))
+        for key, month_events in by_month(events).items():
+            storage.write(key, month_events)
+        update = by_month(changed_season(events))
+        samples = []
+        for _ in range(repeat):
+            # models are loaded before the clock starts
+            months = [(Month(datetime.strptime(key, '%Y%m'), storage), month_events)
+                      for key, month_events in update.items()]
+            started = time.perf_counter()
+            for month, month_events in months:
+                month.update(month_events)
+            samples.append(time.perf_counter() - started)
+        storage.close()
+        return summary(samples)
+    finally:
+        shutil.rmtree(directory)
+
+def main(argv=None):
+
+    """
+    Runs the sync benchmark and prints a report.
+
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the sync hot path with a local stand-in server')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='numbers of events in a season')
+    parser.add_argument('--per-page', type=int, default=10, help='events on a page of the shedule')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each measurement')
+    parser.add_argument('--archive', help='serve the latest sync of the page archive instead of recorded fixtures')
+    parser.add_argument('--json', help='write results to the file')
+    args = parser.parse_args(argv)
+
+    application()
+    # recorded pages go first, synthetic ones show scaling
+    pages = recorded_pages(args.archive) if args.archive else fixture_pages()
+    cases = [('recorded', parsed_events(pages), pages)]
+    for size in args.sizes:
+        events = synthetic_events(size)
+        cases.append((size, events, render_pages(events, args.per_page)))
+
+    results = []
+    for size, events, pages in cases:
+        with StandInServer(pages) as server:
+            sync = bench_sync(pages, server.host, args.repeat)
+        parse = bench_parse(pages, args.repeat)
+        hashing = bench_hashing(pages, args.repeat)
+        row = {'events': size,
+               'pages': len(pages),
+               'sync_ms': sync['p50'],
+               'pages_per_s': sync['pages_per_second'],
+               'parse_ms_per_page': parse['per_page'],
+               'hash_ms': hashing['p50'],
+               'merge_ms': bench_merge(events, args.repeat)['p50'] if events else None,
+               'sync': sync, 'parse': parse, 'hashing': hashing}
+        results.append(row)
+
+    print_table(results, ('events', 'pages', 'sync_ms', 'pages_per_s', 'parse_ms_per_page', 'hash_ms', 'merge_ms'))
+    write_results('sync', results, args.json)
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Helpers shared by benchmarks. Benchmarks do not need a display
+# or the network, run them from the root of the repository:
+#
+#     python -m benchmarks.bench_sync
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import hashlib
+from datetime import datetime, timedelta
+
+# everything is measured without a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from theatre.TheatreModel import Event
+
+# sizes of a season for benchmarks scaling with data
+SIZES = (10, 100, 1000, 10000)
+
+_app = None # the application object of the process
+
+def application(widgets=False):
+
+    """
+    Returns the application object, creates it if needed.
+
+    """
+    global _app
+    from PyQt5 import QtGui, QtWidgets
+    if QtGui.QGuiApplication.instance() is None:
+        cls = QtWidgets.QApplication if widgets else QtGui.QGuiApplication
+        _app = cls(['theatre-benchmark'])
+    return QtGui.QGuiApplication.instance()
+
+def season_dates(count, start=None, days=300):
+
+    """
+    Returns count dates of performances spread over days
+    from the start (tomorrow by default), several a day
+    if there are many of them.
+
+    """
+    if start is None:
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    per_day = max(1, -(-count // days)) # ceiling division
+    dates = []
+    for number in range(count):
+        day, slot = divmod(number, per_day)
+        # performances of a day start at 10:00 and are 10 minutes apart
+        dates.append(start + timedelta(days=day, hours=10, minutes=10 * slot))
+    return dates
+
+def event_hash(date, title):
+
+    """
+    Returns a hashsum of the event the way sync makes it.
+
+    """
+    return hashlib.md5((date.strftime('%Y.%m.%d %H:%M') + title).encode()).digest()
+
+def synthetic_events(count, start=None, synced=True):
+
+    """
+    Returns count events of a season sorted by dates.
+    Synced events have hashsums, others look like added manually.
+
+    """
+    events = []
+    for number, date in enumerate(season_dates(count, start)):
+        title = 'Performance {}'.format(number % 97)
+        people = 'Actor {}, Actor {}'.format(number % 13, number % 29)
+        events.append(Event(date, title, people, event_hash(date, title) if synced else None))
+    return events
+
+def by_month(events):
+
+    """
+    Returns a dictionary YYYYMM -> a list of events.
+
+    """
+    months = {}
+    for event in events:
+        months.setdefault(event.date.strftime('%Y%m'), []).append(event)
+    return months
+
+def measure(func, repeat=5):
+
+    """
+    Calls func repeat times, returns durations in seconds.
+
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def percentile(samples, part):
+
+    """
+    Returns the percentile of samples, part is from 0 to 100.
+
+    """
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(part / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summary(samples):
+
+    """
+    Returns statistics of durations in milliseconds.
+
+    """
+    return {'min': min(samples) * 1000,
+            'p50': percentile(samples, 50) * 1000,
+            'p99': percentile(samples, 99) * 1000,
+            'max': max(samples) * 1000,
+            'runs': len(samples)}
+
+def revision():
+
+    """
+    Returns the current git commit or None.
+
+    """
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                         cwd=os.path.dirname(os.path.abspath(__file__)),
+                                         stderr=subprocess.DEVNULL)
+        return output.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(name, results, filename=None):
+
+    """
+    Writes results with a description of the run as JSON,
+    to compare runs across commits. Returns the document.
+
+    """
+    document = {'benchmark': name,
+                'commit': revision(),
+                'date': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results}
+    if filename:
+        with open(filename, 'w') as output:
+            json.dump(document, output, indent=1)
+    return document
+
+def print_table(rows, columns):
+
+    """
+    Prints rows (dictionaries) as a table with the columns.
+
+    """
+    widths = [max(len(column), *(len(format_value(row.get(column))) for row in rows)) for column in columns]
+    print('  '.join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(format_value(row.get(column)).rjust(width) for column, width in zip(columns, widths)))
+    sys.stdout.flush()
+
+def format_value(value):
+    if isinstance(value, float):
+        return '{:.3f}'.format(value)
+    return str(value)
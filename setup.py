@@ -6,9 +6,22 @@ from theatre.Preferences import is_windows
 entry_points = {
     "gui_scripts": [
         "theatre=theatre.Theatre:start"
+    ],
+    "console_scripts": [
+        "theatre-analytics=theatre.Analytics:main",
+        "theatre-pdf=theatre.PdfExport:main",
+        "theatre-export=theatre.Export:main",
+        "theatre-html=theatre.HtmlExport:main",
+        "theatre-import=theatre.Import:main",
+        "theatre-daemon=theatre.Daemon:main",
+        "theatre-reparse=theatre.Archive:main"
     ]
 }
 
+extras_require = {
+    "analytics": ["numpy"]
+}
+
 data_files = ["icons/*.png"]
 
 if is_windows():
@@ -29,6 +42,7 @@ setup(
     url = "http://www.operetta.kharkiv.ua/",
     license = "GPLv3",
     package_data = {"theatre": data_files},
-    packages=find_packages(),
-    entry_points = entry_points
+    packages=find_packages(exclude=["benchmarks"]),
+    entry_points = entry_points,
+    extras_require = extras_require
 )
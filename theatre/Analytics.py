@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import calendar
+import json
+import sys
+
+import numpy as np
+
+from theatre.Store import Storage
+from theatre.Statistics import split_people
+from theatre.Preferences import Preferences, DB_FILENAME
+
+class EventTable:
+
+    """
+    Events of many months stored in NumPy arrays.
+
+    timestamps   - datetime64[m] times of events
+    title_codes  - indexes of titles in the titles list
+    people_codes - indexes of names in the names list,
+                   one item for each name of each event
+    people_events - indexes of events for items of people_codes
+
+    """
+    def __init__(self, timestamps, title_codes, titles, people_codes, people_events, names):
+        self.timestamps = timestamps
+        self.title_codes = title_codes
+        self.titles = titles
+        self.people_codes = people_codes
+        self.people_events = people_events
+        self.names = names
+
+    @classmethod
+    def load(cls, storage, first=None, last=None):
+
+        """
+        Loads events of stored months.
+        first and last are optional keys (YYYYMM) of a range of months.
+
+        """
+        dates = []
+        titles = []
+        people = []
+        people_events = []
+        for key, events in storage.iter_months(first, last):
+            for event in events:
+                for name in split_people(event.people):
+                    people.append(name)
+                    people_events.append(len(dates))
+                dates.append(event.date)
+                titles.append(event.title)
+        # encode strings as codes of unique values
+        titles, title_codes = np.unique(np.array(titles, dtype=str), return_inverse=True)
+        names, people_codes = np.unique(np.array(people, dtype=str), return_inverse=True)
+        return cls(np.array(dates, dtype='datetime64[m]'),
+                   title_codes.astype(np.int64), list(titles),
+                   people_codes.astype(np.int64), np.array(people_events, dtype=np.int64),
+                   list(names))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def weekdays(self):
+
+        """
+        Returns weekdays of events, Monday is 0.
+
+        """
+        days = self.timestamps.astype('datetime64[D]').astype(np.int64)
+        # 1970-01-01 was Thursday
+        return (days + 3) % 7
+
+    def minutes(self):
+
+        """
+        Returns times of events as minutes since midnight.
+
+        """
+        days = self.timestamps.astype('datetime64[D]')
+        return (self.timestamps - days).astype(np.int64)
+
+    def slots(self):
+
+        """
+        Returns a table of events counts per weekday (rows)
+        and time slot (columns) and a list of time slots.
+
+        """
+        slots, slot_codes = np.unique(self.minutes(), return_inverse=True)
+        cells = self.weekdays() * len(slots) + slot_codes.reshape(-1)
+        counts = np.bincount(cells, minlength=7 * len(slots)).reshape(7, len(slots))
+        labels = ['{:02}:{:02}'.format(minutes // 60, minutes % 60) for minutes in slots]
+        return counts, labels
+
+    def gaps(self):
+
+        """
+        Returns days between repeated performances of each title:
+        a dictionary title -> (runs, mean gap, max gap).
+
+        """
+        order = np.lexsort((self.timestamps, self.title_codes))
+        codes = self.title_codes[order]
+        days = self.timestamps[order].astype('datetime64[D]').astype(np.int64)
+        # a gap is a difference between neighbours with the same title
+        same = codes[1:] == codes[:-1]
+        gaps = np.diff(days)[same]
+        gap_codes = codes[1:][same]
+        size = len(self.titles)
+        runs = np.bincount(self.title_codes, minlength=size)
+        gap_counts = np.bincount(gap_codes, minlength=size)
+        gap_sums = np.bincount(gap_codes, weights=gaps, minlength=size)
+        gap_max = np.zeros(size, dtype=np.int64)
+        np.maximum.at(gap_max, gap_codes, gaps)
+        mean = np.divide(gap_sums, gap_counts, out=np.zeros(size), where=gap_counts > 0)
+        return {title: (int(runs[code]), float(mean[code]), int(gap_max[code]))
+                for code, title in enumerate(self.titles)}
+
+    def coverage(self):
+
+        """
+        Returns a ratio of events with people and a dictionary
+        name -> a ratio of events attended by the person.
+
+        """
+        total = len(self)
+        if not total:
+            return 0.0, {}
+        covered = len(np.unique(self.people_events)) / total
+        counts = np.bincount(self.people_codes, minlength=len(self.names))
+        return covered, {name: counts[code] / total for code, name in enumerate(self.names)}
+
+
+
+def report(table):
+
+    """
+    Returns a dictionary with statistics of the events table.
+
+    """
+    counts, labels = table.slots()
+    covered, people = table.coverage()
+    gaps = table.gaps()
+    return {
+        'events': len(table),
+        'slots': {calendar.day_abbr[day]: dict(zip(labels, (int(n) for n in counts[day]))) for day in range(7)},
+        'gaps': {title: {'runs': runs, 'mean_gap': mean, 'max_gap': longest}
+                 for title, (runs, mean, longest) in gaps.items()},
+        'coverage': covered,
+        'people': people,
+    }
+
+def format_report(data):
+
+    """
+    Returns the report as a plain text.
+
+    """
+    lines = ['Events: {}'.format(data['events']), '', 'Shows per weekday and time:']
+    labels = sorted({label for slots in data['slots'].values() for label in slots})
+    lines.append('     ' + ''.join('{:>7}'.format(label) for label in labels))
+    for day, slots in data['slots'].items():
+        lines.append('{:<5}'.format(day) + ''.join('{:>7}'.format(slots.get(label, 0)) for label in labels))
+    lines += ['', 'Runs and gaps (days) between repeated performances:']
+    for title, gap in sorted(data['gaps'].items(), key=lambda item: -item[1]['runs']):
+        lines.append('{:>5} {:>7.1f} {:>5}  {}'.format(gap['runs'], gap['mean_gap'], gap['max_gap'], title))
+    lines += ['', 'People coverage: {:.1%}'.format(data['coverage'])]
+    for name, ratio in sorted(data['people'].items(), key=lambda item: -item[1]):
+        lines.append('{:>7.1%}  {}'.format(ratio, name))
+    return '\n'.join(lines)
+
+def main(argv=None):
+
+    """
+    The command line entry point of season analytics.
+
+    """
+    parser = argparse.ArgumentParser(description='Season analytics of the theatre shedule')
+    parser.add_argument('--db', help='a path to the shedule database')
+    parser.add_argument('--from', dest='first', metavar='YYYYMM', help='the first month')
+    parser.add_argument('--to', dest='last', metavar='YYYYMM', help='the last month')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    storage = Storage(args.db or Preferences().at_home(DB_FILENAME), 'r')
+    try:
+        table = EventTable.load(storage, args.first, args.last)
+    finally:
+        storage.close()
+    data = report(table)
+    if args.json:
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(format_report(data))
+
+
+
+if __name__ == '__main__':
+    main()
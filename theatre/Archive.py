@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+
+from theatre.Store import Storage, merge_into_storage
+from theatre.Website import Parser, Synchronizer
+from theatre.Preferences import Preferences, DB_FILENAME
+
+ARCHIVE_DIRNAME = 'pages' # a directory of the archive in the home directory
+INDEX_FILENAME = 'index.jsonl' # a list of archived pages
+
+class PageArchive:
+
+    """
+    Keeps raw pages downloaded by synchronizations.
+    Each page is compressed and saved in a file named by a hashsum
+    of its content, so identical pages are stored once.
+    The index lists pages of each sync in order of downloading
+    with the window of months of the sync, and marks completed syncs.
+
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest[2:] + '.z')
+
+    def put(self, sync_id, url, text, first=None, last=None):
+
+        """
+        Saves the page downloaded by the sync.
+        first and last are keys (YYYYMM) of the window of the sync.
+        Returns a hashsum of the page.
+
+        """
+        data = text.encode('utf-8')
+        digest = hashlib.sha1(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # readers never see a half-written page
+            temp = path + '.tmp'
+            with open(temp, 'wb') as page:
+                page.write(zlib.compress(data, 9))
+            os.replace(temp, path)
+        self.append({'sync': sync_id, 'url': url, 'page': digest, 'first': first, 'last': last,
+                     'fetched': datetime.now().strftime('%Y-%m-%dT%H:%M:%S')})
+        return digest
+
+    def complete(self, sync_id):
+
+        """
+        Marks the sync as completed, all its pages have been saved.
+
+        """
+        self.append({'sync': sync_id, 'completed': True})
+
+    def append(self, record):
+
+        """
+        Adds the record to the index.
+
+        """
+        with open(os.path.join(self.directory, INDEX_FILENAME), 'a', encoding='utf-8') as index:
+            index.write(json.dumps(record) + '\n')
+
+    def get(self, digest):
+
+        """
+        Returns the text of the archived page.
+
+        """
+        with open(self.object_path(digest), 'rb') as page:
+            return zlib.decompress(page.read()).decode('utf-8')
+
+    def records(self):
+
+        """
+        Yields records of the index in order of downloading.
+
+        """
+        try:
+            index = open(os.path.join(self.directory, INDEX_FILENAME), 'r', encoding='utf-8')
+        except OSError: # nothing has been archived yet
+            return
+        with index:
+            for line in index:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue # a line of an interrupted write
+
+    def syncs(self):
+
+        """
+        Returns a dictionary sync id -> a description of the sync:
+        'pages' is a list of records of its pages in order of downloading,
+        'first' and 'last' are its window, 'completed' is True if all
+        pages have been downloaded. Ids are sortable by time.
+
+        """
+        syncs = {}
+        for record in self.records():
+            sync = syncs.setdefault(record['sync'], {'pages': [], 'first': None,
+                                                     'last': None, 'completed': False})
+            if record.get('completed'):
+                sync['completed'] = True
+            else:
+                sync['pages'].append(record)
+                sync['first'] = record.get('first')
+                sync['last'] = record.get('last')
+        return syncs
+
+def narrow(window, first, last):
+
+    """
+    Returns the window of months (first, last) limited by other keys.
+
+    """
+    window_first, window_last = window
+    if first is not None and (window_first is None or first > window_first):
+        window_first = first
+    if last is not None and (window_last is None or last < window_last):
+        window_last = last
+    return window_first, window_last
+
+def reparse(archive, sync, first=None, last=None):
+
+    """
+    Parses archived pages of a sync again within its window
+    of months, first and last can limit it further.
+    Returns a synchronizer with collected events.
+
+    """
+    first, last = narrow((sync['first'], sync['last']), first, last)
+    synchronizer = Synchronizer(first, last)
+    for record in sync['pages']:
+        fetched = datetime.strptime(record['fetched'], '%Y-%m-%dT%H:%M:%S')
+        synchronizer.collect(Parser(archive.get(record['page']), fetched))
+    return synchronizer
+
+def main(argv=None):
+
+    """
+    The command line entry point of offline re-parsing.
+
+    """
+    prefs = Preferences()
+    parser = argparse.ArgumentParser(description='Parse archived shedule pages again and merge them into the database')
+    parser.add_argument('--db', help='a path to the shedule database')
+    parser.add_argument('--archive', help='a directory of the archive')
+    parser.add_argument('--sync', help='an archived sync, the latest one by default')
+    parser.add_argument('--all', action='store_true',
+                        help='merge all archived syncs from the oldest one, past events are restored too')
+    parser.add_argument('--from', dest='first', metavar='YYYYMM', help='the first month')
+    parser.add_argument('--to', dest='last', metavar='YYYYMM', help='the last month')
+    parser.add_argument('--list', action='store_true', help='list archived syncs')
+    parser.add_argument('--dry-run', action='store_true', help='parse pages without changing the database')
+    args = parser.parse_args(argv)
+
+    archive = PageArchive(args.archive or prefs.at_home(ARCHIVE_DIRNAME))
+    syncs = archive.syncs()
+    if args.list:
+        for sync_id, sync in sorted(syncs.items()):
+            print('{} {} pages, months {} - {}{}'.format(
+                    sync_id, len(sync['pages']), sync['first'] or 'all', sync['last'] or 'all',
+                    '' if sync['completed'] else ', incomplete'))
+        return 0
+    if not syncs:
+        print('There are no archived pages', file=sys.stderr)
+        return 1
+    if args.all:
+        chosen = sorted(syncs)
+    else:
+        chosen = [args.sync or max(syncs)]
+        if chosen[0] not in syncs:
+            print('There is no sync ' + chosen[0], file=sys.stderr)
+            return 1
+
+    storage = None if args.dry_run else Storage(args.db or prefs.at_home(DB_FILENAME))
+    try:
+        for sync_id in chosen:
+            sync = syncs[sync_id]
+            records = sync['pages']
+            synchronizer = reparse(archive, sync, args.first, args.last)
+            count = sum(len(events) for events in synchronizer.events.values())
+            print('{}: {} pages, {} events, {} skipped articles'.format(
+                    sync_id, len(records), count, synchronizer.skipped))
+            if storage is None:
+                continue
+            if args.all:
+                # old syncs restore events from the time they were downloaded
+                # and do not remove events added by later syncs
+                fetched = datetime.strptime(records[0]['fetched'], '%Y-%m-%dT%H:%M:%S')
+                report = merge_into_storage(storage, synchronizer.events, fetched, remove=False)
+            else:
+                # only a completed sync has all events of its months,
+                # events missing in an incomplete one may be on pages
+                # that have not been downloaded
+                report = merge_into_storage(storage, synchronizer.events, remove=sync['completed'])
+            for key, changes in report.items():
+                print(key)
+                print('\n'.join(changes))
+    finally:
+        if storage is not None:
+            storage.close()
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtCore, QtWidgets, QtGui
+from datetime import datetime
+import calendar
+
+class CalendarView(QtWidgets.QWidget):
+
+    """
+    A month grid showing a number of events
+    and the first title of each day.
+
+    Texts of cells are prepared when the model or the size
+    changes, painting only draws prepared texts.
+
+    """
+    # a signal emitted when user activated a day,
+    # sends a datetime object of the day
+    date_selected = QtCore.pyqtSignal(object)
+
+    header_height = 24 # a height of the row with weekdays
+    padding = 4 # a space between cell borders and texts
+
+    def __init__(self, parent=None):
+        QtWidgets.QWidget.__init__(self, parent)
+        self.setBackgroundRole(QtGui.QPalette.Base)
+        self.setAutoFillBackground(True)
+        self.month = None # a source model of the month
+        self.weeks = [] # days of the month by weeks, 0 is out of the month
+        self.days = {} # a summary of days from the model
+        self.cells = [] # prepared cells: (rect, day, count, title)
+        self.lines = [] # prepared lines of the grid
+        self.headers = [] # prepared weekday names: (rect, name)
+
+    def set_model(self, model):
+
+        """
+        Shows the month of the model.
+
+        """
+        month = model.sourceModel()
+        if self.month is not None:
+            for signal in self.signals(self.month):
+                signal.disconnect(self.refresh)
+        self.month = month
+        for signal in self.signals(month):
+            signal.connect(self.refresh)
+        self.weeks = calendar.monthcalendar(month.date.year, month.date.month)
+        self.refresh()
+
+    @staticmethod
+    def signals(month):
+        return (month.rowsInserted, month.rowsRemoved, month.dataChanged, month.modelReset)
+
+    @QtCore.pyqtSlot()
+    def refresh(self):
+
+        """
+        Reads the summary of days and prepares cells.
+
+        """
+        if not self.isVisible():
+            # the summary is read when the view is shown
+            self.days = None
+            return
+        self.days = self.month.days()
+        self.layout_cells()
+        self.update()
+
+    def showEvent(self, event):
+        QtWidgets.QWidget.showEvent(self, event)
+        if self.days is None and self.month is not None:
+            self.refresh()
+
+    def resizeEvent(self, event):
+        QtWidgets.QWidget.resizeEvent(self, event)
+        if self.days is not None:
+            self.layout_cells()
+
+    def cell_size(self):
+
+        """
+        Returns a width and a height of a cell.
+
+        """
+        rows = max(len(self.weeks), 1)
+        return (self.width() / 7, (self.height() - self.header_height) / rows)
+
+    def layout_cells(self):
+
+        """
+        Computes geometry of the grid and elided texts of cells.
+
+        """
+        width, height = self.cell_size()
+        fm = self.fontMetrics()
+        self.headers = [(QtCore.QRectF(col * width, 0, width, self.header_height), calendar.day_abbr[col])
+                        for col in range(7)]
+        self.lines = [QtCore.QLineF(col * width, 0, col * width, self.height()) for col in range(1, 7)]
+        self.lines += [QtCore.QLineF(0, self.header_height + row * height, self.width(), self.header_height + row * height)
+                       for row in range(len(self.weeks))]
+        self.cells = []
+        text_width = int(width - 2 * self.padding)
+        for row, week in enumerate(self.weeks):
+            for col, day in enumerate(week):
+                if not day:
+                    continue
+                rect = QtCore.QRectF(col * width, self.header_height + row * height, width, height)
+                count, first = self.days.get(day, (0, None))
+                title = ''
+                if first is not None:
+                    title = fm.elidedText('{} {}'.format(first.date.strftime('%H:%M'), first.title),
+                                          QtCore.Qt.ElideRight, text_width)
+                self.cells.append((rect.adjusted(self.padding, self.padding, -self.padding, -self.padding),
+                                   str(day), 'x{}'.format(count) if count > 1 else '', title))
+
+    def paintEvent(self, event):
+        if self.days is None:
+            return
+        painter = QtGui.QPainter(self)
+        painter.setPen(self.palette().color(QtGui.QPalette.Mid))
+        painter.drawLines(self.lines)
+        painter.setPen(self.palette().color(QtGui.QPalette.Text))
+        for rect, name in self.headers:
+            painter.drawText(rect, QtCore.Qt.AlignCenter, name)
+        clip = QtCore.QRectF(event.rect())
+        for rect, day, count, title in self.cells:
+            if not clip.intersects(rect):
+                continue # the cell does not need repainting
+            painter.drawText(rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, day)
+            painter.drawText(rect, QtCore.Qt.AlignRight | QtCore.Qt.AlignTop, count)
+            painter.drawText(rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignBottom, title)
+        painter.end()
+
+    def mouseDoubleClickEvent(self, event):
+
+        """
+        Called when user double-clicked a day.
+
+        """
+        width, height = self.cell_size()
+        row = int((event.y() - self.header_height) // height)
+        col = int(event.x() // width)
+        if event.y() >= self.header_height and 0 <= row < len(self.weeks) and 0 <= col < 7:
+            day = self.weeks[row][col]
+            if day:
+                self.date_selected.emit(datetime(self.month.date.year, self.month.date.month, day))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from theatre.Store import Storage, merge_into_storage
+from theatre.Website import Synchronizer, NetworkError
+from theatre.Preferences import Preferences, DB_FILENAME
+from theatre.Scheduler import SyncScheduler
+
+log = logging.getLogger('theatre.daemon')
+
+class Daemon:
+
+    """
+    Synchronizes the shedule database periodically
+    without a graphical interface.
+
+    """
+    def __init__(self, db, scheduler, first=None, last=None, archive=None):
+        self.db = db
+        self.archive = archive # an optional archive of downloaded pages
+        self.first = first # an optional window of synced months
+        self.last = last
+        self.scheduler = scheduler # chooses delays between synchronizations
+        self.events = {} # events downloaded by the last sync
+        self.synchronizer = None # the running sync
+        self.failed_sync = None # the failed sync is continued by the next one
+        self.stopped = threading.Event()
+
+    def sync(self):
+
+        """
+        Downloads the shedule and merges it into the database.
+        Returns a report of changes or None if the sync failed.
+
+        """
+        self.synchronizer = Synchronizer(self.first, self.last, archive=self.archive)
+        if self.failed_sync is not None and self.synchronizer.resume(self.failed_sync):
+            log.info('Continuing from offset %d', self.synchronizer.start)
+        self.failed_sync = None
+        try:
+            self.events = events = self.synchronizer.run()
+        except NetworkError as e:
+            log.error('An error has occurred when updating: %s', e)
+            self.failed_sync = self.synchronizer
+            return None
+        finally:
+            self.synchronizer = None
+        # the database is opened for a merge only,
+        # so it is not locked between synchronizations
+        storage = Storage(self.db)
+        try:
+            report = merge_into_storage(storage, events)
+        finally:
+            storage.close()
+        if report:
+            for key, changes in report.items():
+                log.info('%s\n%s', key, '\n'.join(changes))
+        elif events:
+            log.info('Shedule is up to date')
+        else:
+            log.warning('Shedule on the server is empty')
+        return report
+
+    def run(self):
+
+        """
+        Synchronizes until the daemon is stopped.
+
+        """
+        while not self.stopped.is_set():
+            report = self.sync()
+            if report is None:
+                delay = self.scheduler.failed()
+            else:
+                delay = self.scheduler.completed(bool(report), self.events)
+            log.debug('The next sync in %d seconds', delay)
+            self.stopped.wait(delay)
+
+    def stop(self, *args):
+
+        """
+        Stops the daemon, can be used as a signal handler.
+        Running sync is cancelled.
+
+        """
+        self.stopped.set()
+        synchronizer = self.synchronizer
+        if synchronizer is not None:
+            synchronizer.cancel()
+
+def main(argv=None):
+
+    """
+    The command line entry point of the sync daemon.
+
+    """
+    prefs = Preferences()
+    parser = argparse.ArgumentParser(description='Synchronize theatre shedules without a graphical interface')
+    parser.add_argument('--db', help='a path to the shedule database')
+    parser.add_argument('--interval', type=int,
+                        help='fixed seconds between synchronizations instead of adaptive ones')
+    parser.add_argument('--from', dest='first', metavar='YYYYMM', help='the first synced month')
+    parser.add_argument('--to', dest='last', metavar='YYYYMM', help='the last synced month')
+    parser.add_argument('--once', action='store_true', help='synchronize once and exit')
+    parser.add_argument('--log', help='a log file, standard error by default')
+    parser.add_argument('--archive', help='a directory to archive downloaded pages')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(filename=args.log, level=logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    if args.interval:
+        scheduler = SyncScheduler(args.interval, args.interval, args.interval, 1.0, 0.0)
+    else:
+        scheduler = SyncScheduler.from_preferences()
+    archive = None
+    if args.archive or prefs['SYNC']['archive_pages']:
+        from theatre.Archive import PageArchive, ARCHIVE_DIRNAME
+        archive = PageArchive(args.archive or prefs.at_home(ARCHIVE_DIRNAME))
+    daemon = Daemon(args.db or prefs.at_home(DB_FILENAME), scheduler, args.first, args.last, archive)
+    if args.once:
+        return 0 if daemon.sync() is not None else 1
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run()
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
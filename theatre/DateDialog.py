@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtCore, QtWidgets
+from datetime import datetime
+
+class DateDialog(QtWidgets.QDialog):
+
+    """
+    Selects a date to jump to.
+
+    """
+    def __init__(self, date=None, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+
+        self.setModal(True) # block parent window
+        self.setWindowTitle('Go to date')
+
+        self.date = None # result date
+
+        # create a calendar and select the date
+        self.calendar = QtWidgets.QCalendarWidget()
+        self.calendar.setGridVisible(True)
+        if date is not None:
+            self.calendar.setSelectedDate(QtCore.QDate(date.year, date.month, date.day))
+        # accept the date on double click and enter
+        self.calendar.activated.connect(self.on_accept)
+
+        # create control buttons
+        self.todayBtn = QtWidgets.QPushButton('Today')
+        self.todayBtn.clicked.connect(lambda: self.calendar.setSelectedDate(QtCore.QDate.currentDate()))
+        self.okBtn = QtWidgets.QPushButton('OK')
+        self.okBtn.clicked.connect(self.on_accept)
+        self.cancelBtn = QtWidgets.QPushButton('Cancel')
+        self.cancelBtn.clicked.connect(self.reject)
+
+        # add buttons to layout
+        btnBox = QtWidgets.QHBoxLayout()
+        btnBox.addWidget(self.todayBtn)
+        btnBox.addStretch()
+        btnBox.addWidget(self.okBtn)
+        btnBox.addWidget(self.cancelBtn)
+
+        # add layouts to main layout
+        mainBox = QtWidgets.QVBoxLayout()
+        mainBox.addWidget(self.calendar)
+        mainBox.addLayout(btnBox)
+
+        # set layout to the window
+        self.setLayout(mainBox)
+
+    @QtCore.pyqtSlot()
+    def on_accept(self):
+
+        """
+        Called when OK button was pressed.
+
+        """
+        date = self.calendar.selectedDate()
+        self.date = datetime(date.year(), date.month(), date.day())
+        self.accept() # set 'accept' code
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import csv
+import hashlib
+import sys
+from datetime import datetime, timedelta
+
+from theatre.Store import Storage
+from theatre.Preferences import Preferences, DB_FILENAME
+
+UID_DOMAIN = 'operetta.kharkiv.ua' # a domain part of events' UIDs
+DURATION = timedelta(hours=3) # assumed duration of a performance
+
+CSV_HEADER = ('date', 'time', 'title', 'people', 'uid')
+
+def iter_events(storage, first=None, last=None):
+
+    """
+    Yields stored events month by month in order of dates.
+    first and last are optional keys (YYYYMM) of a range of months.
+
+    """
+    for key, events in storage.iter_months(first, last):
+        for event in sorted(events, key=lambda event: event.date):
+            yield event
+
+def event_uid(event):
+
+    """
+    Returns a stable unique identifier of the event.
+    Synced events are identified by their hashsum, so the identifier
+    changes only when the event is changed on the website.
+    Manually added events are identified by their date.
+
+    """
+    if event.hash is not None:
+        uid = event.hash.hex()
+    else:
+        uid = 'manual-' + hashlib.md5(event.date.strftime('%Y.%m.%d %H:%M').encode()).hexdigest()
+    return '{}@{}'.format(uid, UID_DOMAIN)
+
+def write_csv(stream, events):
+
+    """
+    Writes events to the text stream in CSV format.
+    Returns a number of written events.
+
+    """
+    writer = csv.writer(stream)
+    writer.writerow(CSV_HEADER)
+    count = 0
+    for event in events:
+        writer.writerow((event.date.strftime('%Y-%m-%d'), event.date.strftime('%H:%M'),
+                         event.title, event.people or '', event_uid(event)))
+        count += 1
+    return count
+
+def ics_escape(text):
+
+    """
+    Escapes special characters of iCalendar text values.
+
+    """
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def ics_fold(line):
+
+    """
+    Splits a content line to lines not longer than 75 octets.
+
+    """
+    data = line.encode()
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts = []
+    while data:
+        size = 75 if not parts else 74 # continuation lines start with a space
+        # do not break multibyte characters
+        while size < len(data) and (data[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(data[:size].decode())
+        data = data[size:]
+    return '\r\n '.join(parts) + '\r\n'
+
+def write_ics(stream, events, name='Theatre shedule'):
+
+    """
+    Writes events to the text stream in iCalendar format.
+    Returns a number of written events.
+
+    """
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    stream.write(ics_fold('BEGIN:VCALENDAR'))
+    stream.write(ics_fold('VERSION:2.0'))
+    stream.write(ics_fold('PRODID:-//Theatre Shedule Manager//EN'))
+    stream.write(ics_fold('X-WR-CALNAME:' + ics_escape(name)))
+    count = 0
+    for event in events:
+        stream.write(ics_fold('BEGIN:VEVENT'))
+        stream.write(ics_fold('UID:' + event_uid(event)))
+        stream.write(ics_fold('DTSTAMP:' + stamp))
+        # times are local times of the theatre
+        stream.write(ics_fold('DTSTART:' + event.date.strftime('%Y%m%dT%H%M%S')))
+        stream.write(ics_fold('DTEND:' + (event.date + DURATION).strftime('%Y%m%dT%H%M%S')))
+        stream.write(ics_fold('SUMMARY:' + ics_escape(event.title)))
+        if event.people:
+            stream.write(ics_fold('DESCRIPTION:' + ics_escape(event.people)))
+        stream.write(ics_fold('END:VEVENT'))
+        count += 1
+    stream.write(ics_fold('END:VCALENDAR'))
+    return count
+
+# writers of supported formats
+WRITERS = {'csv': write_csv, 'ics': write_ics}
+
+def export(storage, filename, fmt=None, first=None, last=None):
+
+    """
+    Writes stored events to the file in CSV or iCalendar format.
+    The format is taken from the file extension by default.
+    Returns a number of written events.
+
+    """
+    fmt = fmt or filename.rsplit('.', 1)[-1].lower()
+    if fmt not in WRITERS:
+        raise ValueError('Unknown export format: ' + fmt)
+    # iCalendar requires CRLF, csv module writes it by itself
+    with open(filename, 'w', encoding='utf-8', newline='') as stream:
+        return WRITERS[fmt](stream, iter_events(storage, first, last))
+
+def main(argv=None):
+
+    """
+    The command line entry point of export.
+
+    """
+    parser = argparse.ArgumentParser(description='Export theatre shedules to iCalendar or CSV')
+    parser.add_argument('output', help='an output file (.ics or .csv), - for standard output')
+    parser.add_argument('--db', help='a path to the shedule database')
+    parser.add_argument('--format', choices=sorted(WRITERS), help='an output format')
+    parser.add_argument('--from', dest='first', metavar='YYYYMM', help='the first month')
+    parser.add_argument('--to', dest='last', metavar='YYYYMM', help='the last month')
+    args = parser.parse_args(argv)
+
+    storage = Storage(args.db or Preferences().at_home(DB_FILENAME), 'r')
+    try:
+        if args.output == '-':
+            writer = WRITERS[args.format or 'ics']
+            count = writer(sys.stdout, iter_events(storage, args.first, args.last))
+        else:
+            count = export(storage, args.output, args.format, args.first, args.last)
+    finally:
+        storage.close()
+    print('Exported events: {}'.format(count), file=sys.stderr)
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
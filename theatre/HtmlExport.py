@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import calendar
+import html
+import json
+import os
+import sys
+from string import Template
+
+from theatre.Store import Storage, digest
+from theatre.Preferences import Preferences, DB_FILENAME
+
+DIGESTS_FILENAME = 'digests.json' # digests and counts of events of published months
+INDEX_FILENAME = 'index.html'
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+table { border-collapse: collapse; }
+td, th { padding: 4px 12px; }
+tr.day td { border-top: 1px solid #999; }
+</style>
+</head>
+<body>
+<p><a href="index.html">All months</a></p>
+<h1>$title</h1>
+<table>
+<tr><th>Date</th><th>Time</th><th>Title</th><th>Who</th></tr>
+$rows
+</table>
+</body>
+</html>
+'''
+
+ROW_TEMPLATE = '<tr class="$css"><td>$date</td><td>$time</td><td>$title</td><td>$people</td></tr>'
+
+INDEX_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Theatre shedule</title>
+</head>
+<body>
+<h1>Theatre shedule</h1>
+<ul>
+$items
+</ul>
+</body>
+</html>
+'''
+
+ITEM_TEMPLATE = '<li><a href="$href">$name</a> ($count)</li>'
+
+def month_name(key):
+
+    """
+    Returns a name of the month with a year.
+
+    """
+    return '{} {}'.format(calendar.month_name[int(key[4:])], key[:4])
+
+
+
+class HtmlExporter:
+
+    """
+    Writes a page for each month and an index page.
+    Digests of published months are saved in the directory,
+    so a page is written again only when events of the month
+    have been changed. Counts of events shown in the index
+    are saved with them.
+
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        # templates are parsed once for all pages
+        self.page = Template(PAGE_TEMPLATE)
+        self.row = Template(ROW_TEMPLATE)
+        self.index = Template(INDEX_TEMPLATE)
+        self.item = Template(ITEM_TEMPLATE)
+        self.digests, self.counts = self.load_digests()
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def load_digests(self):
+
+        """
+        Reads digests and counts of events of published months.
+
+        """
+        try:
+            with open(self.path(DIGESTS_FILENAME), 'r') as digests_file:
+                published = json.load(digests_file)
+        except (OSError, ValueError):
+            # nothing has been published yet
+            return {}, {}
+        return published['digests'], published['counts']
+
+    def write(self, filename, text):
+
+        """
+        Replaces the file, readers never see a half-written page.
+
+        """
+        temp = self.path(filename + '.tmp')
+        with open(temp, 'w', encoding='utf-8') as page:
+            page.write(text)
+        os.replace(temp, self.path(filename))
+
+    def render_month(self, key, events):
+
+        """
+        Returns a page of the month.
+
+        """
+        rows = []
+        prev_event = None
+        for event in sorted(events, key=lambda event: event.date):
+            new_day = prev_event is None or prev_event.date.day != event.date.day
+            rows.append(self.row.substitute(
+                css='day' if new_day else '',
+                # a date is shown in the first row of the day only
+                date=event.date.strftime('%d %a') if new_day else '',
+                time=event.date.strftime('%H:%M'),
+                title=html.escape(event.title or ''),
+                people=html.escape(event.people or '')))
+            prev_event = event
+        return self.page.substitute(title=html.escape(month_name(key)), rows='\n'.join(rows))
+
+    def render_index(self, counts):
+
+        """
+        Returns the index page with links to all months.
+
+        """
+        items = [self.item.substitute(href=key + '.html', name=html.escape(month_name(key)), count=count)
+                 for key, count in sorted(counts.items(), reverse=True)]
+        return self.index.substitute(items='\n'.join(items))
+
+    def export(self, storage, force=False):
+
+        """
+        Writes pages of changed months and the index.
+        Returns a list of written files.
+
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        written = []
+        digests = {}
+        counts = {}
+        for key, events in storage.iter_months():
+            if not events:
+                continue # do not publish empty months
+            filename = key + '.html'
+            digests[key] = digest(events)
+            counts[key] = len(events)
+            if force or self.digests.get(key) != digests[key] or not os.path.exists(self.path(filename)):
+                self.write(filename, self.render_month(key, events))
+                written.append(filename)
+        # remove pages of months that are not stored anymore
+        for key in set(self.digests) - set(digests):
+            try:
+                os.remove(self.path(key + '.html'))
+            except OSError:
+                pass
+        # the index shows months and their counts of events only
+        if force or counts != self.counts or not os.path.exists(self.path(INDEX_FILENAME)):
+            self.write(INDEX_FILENAME, self.render_index(counts))
+            written.append(INDEX_FILENAME)
+        if digests != self.digests or counts != self.counts:
+            self.write(DIGESTS_FILENAME, json.dumps({'digests': digests, 'counts': counts},
+                                                    indent=1, sort_keys=True))
+            self.digests = digests
+            self.counts = counts
+        return written
+
+def main(argv=None):
+
+    """
+    The command line entry point of HTML export.
+
+    """
+    parser = argparse.ArgumentParser(description='Publish theatre shedules as static HTML pages')
+    parser.add_argument('directory', help='an output directory')
+    parser.add_argument('--db', help='a path to the shedule database')
+    parser.add_argument('--force', action='store_true', help='write all pages')
+    args = parser.parse_args(argv)
+
+    storage = Storage(args.db or Preferences().at_home(DB_FILENAME), 'r')
+    try:
+        written = HtmlExporter(args.directory).export(storage, args.force)
+    finally:
+        storage.close()
+    for filename in written:
+        print(os.path.join(args.directory, filename))
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import csv
+import re
+import sys
+from datetime import datetime
+
+from theatre.TheatreModel import Shedule, Event
+from theatre.Preferences import Preferences, DB_FILENAME
+
+# UIDs made by the exporter contain a hashsum of the event
+UID_HASH = re.compile(r'^([0-9a-f]{32})@')
+
+def uid_hash(uid):
+
+    """
+    Returns a hashsum of the event from its UID
+    or None if the event has been added manually.
+
+    """
+    match = UID_HASH.match(uid or '')
+    if match is None:
+        return None
+    return bytes.fromhex(match.group(1))
+
+def read_csv(stream):
+
+    """
+    Yields events from the text stream in CSV format
+    with columns date, time, title, people and uid.
+
+    """
+    for row in csv.DictReader(stream):
+        date = row['date'].strip()
+        time = (row.get('time') or '00:00').strip()
+        yield Event(datetime.strptime('{} {}'.format(date, time), '%Y-%m-%d %H:%M'),
+                    row['title'].strip(), (row.get('people') or '').strip(),
+                    uid_hash(row.get('uid')))
+
+def ics_unescape(text):
+
+    """
+    Restores special characters of iCalendar text values.
+
+    """
+    return re.sub(r'\\(.)', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), text)
+
+def ics_lines(stream):
+
+    """
+    Yields unfolded content lines of iCalendar data.
+
+    """
+    line = None
+    for raw in stream:
+        raw = raw.rstrip('\r\n')
+        if raw[:1] in (' ', '\t'): # a continuation of the previous line
+            line = (line or '') + raw[1:]
+            continue
+        if line is not None:
+            yield line
+        line = raw
+    if line is not None:
+        yield line
+
+def read_ics(stream):
+
+    """
+    Yields events from the text stream in iCalendar format.
+    Times are read as local times of the theatre.
+
+    """
+    props = None
+    for line in ics_lines(stream):
+        name, _, value = line.partition(':')
+        # drop parameters like DTSTART;TZID=...
+        name = name.split(';', 1)[0].upper()
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            props = {}
+        elif name == 'END' and value.upper() == 'VEVENT' and props is not None:
+            if 'DTSTART' in props and 'SUMMARY' in props:
+                start = props['DTSTART'].rstrip('Z')
+                date = datetime.strptime(start[:15], '%Y%m%dT%H%M%S') if 'T' in start \
+                        else datetime.strptime(start[:8], '%Y%m%d')
+                yield Event(date, ics_unescape(props['SUMMARY']),
+                            ics_unescape(props.get('DESCRIPTION', '')), uid_hash(props.get('UID')))
+            props = None
+        elif props is not None:
+            props[name] = value
+
+# readers of supported formats
+READERS = {'csv': read_csv, 'ics': read_ics}
+
+def group_by_month(events):
+
+    """
+    Returns a dictionary YYYYMM -> a list of events.
+
+    """
+    months = {}
+    for event in events:
+        months.setdefault(event.date.strftime('%Y%m'), []).append(event)
+    return months
+
+def merge_imported(existing, imported):
+
+    """
+    Merges imported events into existing events of a month.
+    Events with the same hashsum are the same events, otherwise
+    an event at the same time is replaced, keeping its people
+    if the imported event has none. Other events are added.
+
+    Returns merged events and numbers of added and changed events.
+
+    """
+    merged = list(existing)
+    hashes = {event.hash for event in merged if event.hash is not None}
+    by_date = {event.date: number for number, event in enumerate(merged)}
+    added = changed = 0
+    for event in imported:
+        if event.hash is not None and event.hash in hashes:
+            continue # already known
+        number = by_date.get(event.date)
+        if number is None:
+            by_date[event.date] = len(merged)
+            merged.append(event)
+            added += 1
+            continue
+        old = merged[number]
+        if (old.title, old.people, old.hash) == (event.title, event.people or old.people, event.hash):
+            continue # nothing new
+        merged[number] = Event(event.date, event.title, event.people or old.people, event.hash)
+        changed += 1
+        if event.hash is not None:
+            hashes.add(event.hash)
+    return merged, added, changed
+
+def import_events(shedule, events):
+
+    """
+    Imports events into the shedule. Each month is written to
+    the storage at once and loaded models are reloaded.
+    Returns a dictionary YYYYMM -> (added, changed).
+
+    """
+    report = {}
+    for key, imported in sorted(group_by_month(events).items()):
+        existing = shedule.read_events(key)
+        merged, added, changed = merge_imported(existing, imported)
+        if not (added or changed):
+            continue
+        merged.sort(key=lambda event: event.date)
+        shedule.storage.write(key, merged)
+        if key in shedule.cache:
+            # the model shows merged events without re-sorting each row
+            month = shedule.cache[key].sourceModel()
+            month.clear()
+            month.load()
+        report[key] = (added, changed)
+    shedule.storage.sync()
+    return report
+
+def import_file(shedule, filename, fmt=None):
+
+    """
+    Imports events from the file in CSV or iCalendar format.
+    The format is taken from the file extension by default.
+    Returns a dictionary YYYYMM -> (added, changed).
+
+    """
+    fmt = fmt or filename.rsplit('.', 1)[-1].lower()
+    if fmt not in READERS:
+        raise ValueError('Unknown import format: ' + fmt)
+    with open(filename, 'r', encoding='utf-8', newline='') as stream:
+        return import_events(shedule, READERS[fmt](stream))
+
+def main(argv=None):
+
+    """
+    The command line entry point of import.
+
+    """
+    parser = argparse.ArgumentParser(description='Import theatre shedules from iCalendar or CSV')
+    parser.add_argument('input', help='an input file (.ics or .csv)')
+    parser.add_argument('--db', help='a path to the shedule database')
+    parser.add_argument('--format', choices=sorted(READERS), help='an input format')
+    args = parser.parse_args(argv)
+
+    shedule = Shedule(args.db or Preferences().at_home(DB_FILENAME))
+    try:
+        report = import_file(shedule, args.input, args.format)
+    finally:
+        shedule.close()
+    for key, (added, changed) in report.items():
+        print('{}: added {}, changed {}'.format(key, added, changed))
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
+import calendar
 from PyQt5 import QtWidgets, QtCore, QtGui
 from datetime import datetime
 
-from theatre.EditDialog import EditDialog
-from theatre.TheatreModel import Event
-from theatre.Sync import SyncThread
-from theatre.Print import Print
+from theatre.TheatreModel import Event, EventFilter
+from theatre.CalendarView import CalendarView
+from theatre.Resources import ICON_DEFAULT
 
-# path where script is located
-CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
-
-# path to default application icon
-ICON_DEFAULT = os.sep.join([CURRENT_PATH, 'icons', 'icon.png'])
-# path to application icon used when there are updates
-ICON_NEW = os.sep.join([CURRENT_PATH, 'icons', 'icon_new.png'])
+# dialogs, printing, import and export are imported
+# when they are used first time to make startup faster
 
 class ControlButton(QtWidgets.QPushButton):
 
@@ -110,6 +104,86 @@ class ControlWidget(QtWidgets.QWidget):
         self.year.setText(date.strftime('%Y'))
 
 
+class FilterWidget(QtWidgets.QWidget):
+
+    """
+    Conditions of events shown in the table.
+
+    """
+    # a signal emitted when any condition has been changed
+    changed = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        QtWidgets.QWidget.__init__(self, parent)
+
+        # create widgets
+        self.titleEdit = QtWidgets.QLineEdit()
+        self.titleEdit.setPlaceholderText('Title')
+        self.peopleEdit = QtWidgets.QLineEdit()
+        self.peopleEdit.setPlaceholderText('Who')
+        self.weekdayEdit = QtWidgets.QComboBox()
+        self.weekdayEdit.addItem('Any day', None)
+        for day in range(7):
+            self.weekdayEdit.addItem(calendar.day_abbr[day], day)
+        self.fromEdit = QtWidgets.QTimeEdit(QtCore.QTime(0, 0))
+        self.fromEdit.setDisplayFormat('hh:mm')
+        self.toEdit = QtWidgets.QTimeEdit(QtCore.QTime(23, 59))
+        self.toEdit.setDisplayFormat('hh:mm')
+        self.resetBtn = ControlButton(QtGui.QIcon.fromTheme('edit-clear'))
+        self.resetBtn.setToolTip('Reset filter')
+        self.resetBtn.clicked.connect(self.reset)
+
+        # emit changed signal when user changes conditions
+        self.titleEdit.textChanged.connect(self.changed)
+        self.peopleEdit.textChanged.connect(self.changed)
+        self.weekdayEdit.currentIndexChanged.connect(self.changed)
+        self.fromEdit.timeChanged.connect(self.changed)
+        self.toEdit.timeChanged.connect(self.changed)
+
+        # attach widgets to layout
+        mainBox = QtWidgets.QHBoxLayout()
+        mainBox.addWidget(self.titleEdit, 2)
+        mainBox.addWidget(self.peopleEdit, 1)
+        mainBox.addWidget(self.weekdayEdit)
+        mainBox.addWidget(self.fromEdit)
+        mainBox.addWidget(self.toEdit)
+        mainBox.addWidget(self.resetBtn)
+        # set layout to the window
+        self.setLayout(mainBox)
+
+    @QtCore.pyqtSlot()
+    def reset(self):
+
+        """
+        Resets all conditions.
+
+        """
+        self.blockSignals(True)
+        self.titleEdit.clear()
+        self.peopleEdit.clear()
+        self.weekdayEdit.setCurrentIndex(0)
+        self.fromEdit.setTime(QtCore.QTime(0, 0))
+        self.toEdit.setTime(QtCore.QTime(23, 59))
+        self.blockSignals(False)
+        self.changed.emit()
+
+    def event_filter(self):
+
+        """
+        Returns an EventFilter with current conditions.
+
+        """
+        start = self.fromEdit.time()
+        end = self.toEdit.time()
+        start = start.hour() * 60 + start.minute()
+        end = end.hour() * 60 + end.minute()
+        return EventFilter(self.titleEdit.text(), self.peopleEdit.text(),
+                           self.weekdayEdit.currentData(),
+                           start if start > 0 else None,
+                           end if end < 23 * 60 + 59 else None)
+
+
+
 class MenuBar(QtWidgets.QMenuBar):
 
     """
@@ -130,8 +204,17 @@ class MenuBar(QtWidgets.QMenuBar):
         self.print_action = sheduleMenu.addAction(QtGui.QIcon.fromTheme('fileprint'), 'Print')
         self.print_action.setShortcut('Ctrl+P')
         self.print_action.setStatusTip('Print current shedule')
+        self.preview_action = sheduleMenu.addAction(QtGui.QIcon.fromTheme('document-print-preview'), 'Print preview')
+        self.preview_action.setShortcut('Ctrl+Shift+P')
+        self.preview_action.setStatusTip('Show how current shedule will be printed')
+        self.import_action = sheduleMenu.addAction(QtGui.QIcon.fromTheme('document-import'), 'Import')
+        self.import_action.setStatusTip('Import shedules from iCalendar or CSV')
+        self.export_action = sheduleMenu.addAction(QtGui.QIcon.fromTheme('document-export'), 'Export')
+        self.export_action.setStatusTip('Export saved shedules to iCalendar or CSV')
         self.clear_action = sheduleMenu.addAction(QtGui.QIcon.fromTheme('edit-delete'), 'Clear')
         self.clear_action.setStatusTip('Clear current shedule')
+        self.stats_action = sheduleMenu.addAction(QtGui.QIcon.fromTheme('document-properties'), 'Statistics')
+        self.stats_action.setStatusTip('Show counts of events per person and title')
         sheduleMenu.addSeparator()
         self.quit_action = sheduleMenu.addAction(QtGui.QIcon.fromTheme('exit'), 'Quit')
         self.quit_action.setShortcut('Ctrl+Q')
@@ -161,10 +244,30 @@ class MenuBar(QtWidgets.QMenuBar):
         self.actual_action = navigateMenu.addAction(QtGui.QIcon.fromTheme('go-home'), 'Current month')
         self.actual_action.setShortcut('Ctrl+H')
         self.actual_action.setStatusTip('Open currect month')
+        self.date_action = navigateMenu.addAction(QtGui.QIcon.fromTheme('go-jump'), 'Go to date')
+        self.date_action.setShortcut('Ctrl+G')
+        self.date_action.setStatusTip('Open a month of selected date')
+        self.calendar_action = navigateMenu.addAction(QtGui.QIcon.fromTheme('view-calendar-month'), 'Calendar')
+        self.calendar_action.setCheckable(True)
+        self.calendar_action.setShortcut('Ctrl+Shift+C')
+        self.calendar_action.setStatusTip('Show the month as a calendar')
+        self.season_action = navigateMenu.addAction(QtGui.QIcon.fromTheme('view-calendar-list'), 'Season view')
+        self.season_action.setShortcut('Ctrl+Shift+S')
+        self.season_action.setStatusTip('Show events of many months in one table')
+        navigateMenu.addSeparator()
+        self.filter_action = navigateMenu.addAction(QtGui.QIcon.fromTheme('view-filter'), 'Filter')
+        self.filter_action.setCheckable(True)
+        self.filter_action.setShortcut('Ctrl+Shift+L')
+        self.filter_action.setStatusTip('Show or hide the filter of events')
+        self.search_action = navigateMenu.addAction(QtGui.QIcon.fromTheme('edit-find'), 'Search events')
+        self.search_action.setShortcut('Ctrl+Shift+F')
+        self.search_action.setStatusTip('Search events by titles and people')
 
         syncMenu = self.addMenu('&Sync')
         self.sync_all_action = syncMenu.addAction(QtGui.QIcon.fromTheme('reload'), 'Sync all')
         self.sync_all_action.setStatusTip('Sync all shedules')
+        self.sync_month_action = syncMenu.addAction(QtGui.QIcon.fromTheme('reload'), 'Sync this month')
+        self.sync_month_action.setStatusTip('Sync the shown month only')
 
 
 
@@ -205,6 +308,7 @@ class SheduleTableView(QtWidgets.QTableView):
         # initially selected nothing
         self.selected_event = None
         self.selected_row = None
+        self.event_filter = None # a filter applied to all models
         self.menu = TableContextMenu()
 
     def resizeEvent(self, event):
@@ -222,28 +326,66 @@ class SheduleTableView(QtWidgets.QTableView):
         # column 2 fills the rest of width
         self.setColumnWidth(2, size.width() - 200)
 
+    def set_filter(self, event_filter):
+
+        """
+        Shows only events accepted by the filter.
+
+        """
+        self.event_filter = event_filter
+        model = self.model()
+        if model is not None:
+            self.clearSelection()
+            model.set_filter(event_filter)
+
     def setModel(self, model):
 
         """
         Sets a model of selected month's shedule.
 
         """
+        model.set_filter(self.event_filter)
+        if self.model() is not None:
+            for signal in self.signals(self.model()):
+                signal.disconnect(self.on_rows_moved)
         QtWidgets.QTableView.setModel(self, model)
         self.selectionModel().selectionChanged.connect(self.selection_changed)
+        # rows of the selected event change when the model is changed
+        for signal in self.signals(model):
+            signal.connect(self.on_rows_moved)
         # clearselected items
         self.selected_event = None
         self.selected_row = None
         if model.date == datetime(datetime.today().year, datetime.today().month, 1):
             # if current month has been selected
             # select nearest event and scrool to it
-            row = 0 # current row is 0
-            for event in model:
-                if event.date >= datetime.now():
-                    # if next event will be in the future
-                    self.selectRow(row) # select current event
-                    self.scrollTo(self.selectedIndexes()[0])
-                    break
-                row += 1 # go to next row
+            self.select_date(datetime.now())
+
+    def select_date(self, date):
+
+        """
+        Selects the first event at the date or later
+        and scrolls to it.
+
+        """
+        row = self.model().nearest_row(date)
+        if row is not None:
+            self.selectRow(row)
+            self.scrollTo(self.model().index(row, 0))
+
+    @staticmethod
+    def signals(model):
+        return (model.rowsInserted, model.rowsRemoved, model.layoutChanged, model.modelReset)
+
+    @QtCore.pyqtSlot()
+    def on_rows_moved(self):
+
+        """
+        Called when rows of the model have been added, removed,
+        sorted or reset. Reads the selected event again.
+
+        """
+        self.selection_changed(self.selectionModel().selection(), QtCore.QItemSelection())
 
     @QtCore.pyqtSlot('QItemSelection', 'QItemSelection')
     def selection_changed(self, selected, deselected):
@@ -300,6 +442,7 @@ class MainWindow(QtWidgets.QMainWindow):
     """
     # a signal emitted when visibility of the window changes
     visible_signal = QtCore.pyqtSignal(bool)
+    sync_month_signal = QtCore.pyqtSignal(str) # a key (YYYYMM) of the shown month
 
     def __init__(self, shedule, parent=None):
         QtWidgets.QMainWindow.__init__(self, parent)
@@ -311,6 +454,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.shedule = shedule
         self.thread = None # sinchronization thread
+        self.search_dialog = None # do not create SearchDialog until it's needed
+        self.season_window = None # and SeasonWindow too
 
         # create menu bar and connect signals
         self.menubar = MenuBar(self)
@@ -319,12 +464,20 @@ class MainWindow(QtWidgets.QMainWindow):
         self.menubar.save_action.triggered.connect(self.on_save_clicked)
         self.menubar.clear_action.triggered.connect(self.on_clear_clicked)
         self.menubar.print_action.triggered.connect(self.on_print_clicked)
+        self.menubar.preview_action.triggered.connect(self.on_preview_clicked)
+        self.menubar.export_action.triggered.connect(self.on_export_clicked)
+        self.menubar.import_action.triggered.connect(self.on_import_clicked)
         self.menubar.add_action.triggered.connect(self.on_add_clicked)
         self.menubar.edit_action.triggered.connect(self.on_edit_clicked)
         self.menubar.delete_action.triggered.connect(self.on_delete_clicked)
         self.menubar.next_action.triggered.connect(self.on_next_clicked)
         self.menubar.prev_action.triggered.connect(self.on_prev_clicked)
         self.menubar.actual_action.triggered.connect(self.set_actual_month)
+        self.menubar.date_action.triggered.connect(self.on_date_clicked)
+        self.menubar.season_action.triggered.connect(self.on_season_clicked)
+        self.menubar.search_action.triggered.connect(self.on_search_clicked)
+        self.menubar.stats_action.triggered.connect(self.on_stats_clicked)
+        self.menubar.sync_month_action.triggered.connect(self.on_sync_month_clicked)
 
         # create control widget and connect signals
         self.control_widget = ControlWidget()
@@ -336,12 +489,31 @@ class MainWindow(QtWidgets.QMainWindow):
         dock_widget.setWidget(self.control_widget)
         self.addDockWidget(QtCore.Qt.TopDockWidgetArea, dock_widget)
 
+        # create filter widget, it's hidden until user needs it
+        self.filter_widget = FilterWidget()
+        self.filter_widget.changed.connect(self.on_filter_changed)
+        self.filter_dock = QtWidgets.QDockWidget(self)
+        self.filter_dock.setFeatures(QtWidgets.QDockWidget.NoDockWidgetFeatures)
+        self.filter_dock.setTitleBarWidget(QtWidgets.QWidget())
+        self.filter_dock.setWidget(self.filter_widget)
+        self.addDockWidget(QtCore.Qt.TopDockWidgetArea, self.filter_dock)
+        self.filter_dock.hide()
+        self.menubar.filter_action.toggled.connect(self.on_filter_toggled)
+
         # create table view
         self.table = SheduleTableView(self)
         # edit event on double click and enter
         self.table.doubleClicked.connect(lambda index: self.on_edit_clicked())
         self.table.enter_pressed.connect(self.on_edit_clicked)
-        self.setCentralWidget(self.table) # use table as central widget
+        # create calendar view, open a table of the day on double click
+        self.calendar = CalendarView(self)
+        self.calendar.date_selected.connect(self.on_calendar_date)
+        self.menubar.calendar_action.toggled.connect(self.on_calendar_toggled)
+        # table and calendar share the central area
+        self.views = QtWidgets.QStackedWidget(self)
+        self.views.addWidget(self.table)
+        self.views.addWidget(self.calendar)
+        self.setCentralWidget(self.views)
         # connect table context menu actions
         self.table.menu.add_action.triggered.connect(self.on_add_clicked)
         self.table.menu.edit_action.triggered.connect(self.on_edit_clicked)
@@ -374,6 +546,37 @@ class MainWindow(QtWidgets.QMainWindow):
         """
         self.visible_signal.emit(True)
 
+    def set_model(self, model):
+
+        """
+        Sets the month's model to the table and the calendar.
+
+        """
+        self.table.setModel(model)
+        self.calendar.set_model(model)
+        # change a date of control widget
+        self.control_widget.set_date(model.date)
+
+    @QtCore.pyqtSlot(bool)
+    def on_calendar_toggled(self, checked):
+
+        """
+        Switches between the table and the calendar.
+
+        """
+        self.views.setCurrentWidget(self.calendar if checked else self.table)
+
+    @QtCore.pyqtSlot(object)
+    def on_calendar_date(self, date):
+
+        """
+        Opens the table with events of the day.
+
+        """
+        self.menubar.calendar_action.setChecked(False)
+        self.table.select_date(date)
+        self.table.setFocus()
+
     @QtCore.pyqtSlot()
     def set_actual_month(self):
 
@@ -384,9 +587,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # get a model from the shedule
         model = self.shedule.get_actual()
         # set the model
-        self.table.setModel(model)
-        # change a date of control widget
-        self.control_widget.set_date(model.date)
+        self.set_model(model)
 
     @QtCore.pyqtSlot()
     def on_next_clicked(self):
@@ -398,9 +599,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # get a model from the shedule
         model = self.shedule.get_next()
         # set the model
-        self.table.setModel(model)
-        # change a date of control widget
-        self.control_widget.set_date(model.date)
+        self.set_model(model)
 
     @QtCore.pyqtSlot()
     def on_prev_clicked(self):
@@ -412,9 +611,110 @@ class MainWindow(QtWidgets.QMainWindow):
         # get a model from the shedule
         model = self.shedule.get_previous()
         # set the model
-        self.table.setModel(model)
-        # change a date of control widget
-        self.control_widget.set_date(model.date)
+        self.set_model(model)
+
+    @QtCore.pyqtSlot(bool)
+    def on_filter_toggled(self, checked):
+
+        """
+        Shows or hides the filter.
+
+        """
+        self.filter_dock.setVisible(checked)
+        if checked:
+            self.filter_widget.titleEdit.setFocus()
+            self.on_filter_changed()
+        else:
+            # hidden filter does not affect the table
+            self.table.set_filter(None)
+
+    @QtCore.pyqtSlot()
+    def on_filter_changed(self):
+
+        """
+        Applies new conditions of the filter.
+
+        """
+        self.table.set_filter(self.filter_widget.event_filter())
+
+    @QtCore.pyqtSlot()
+    def on_search_clicked(self):
+
+        """
+        Shows the search dialog.
+
+        """
+        from theatre.SearchDialog import SearchDialog
+        if self.search_dialog is None: # if the dialog has not been created yet
+            self.search_dialog = SearchDialog(self.shedule, self)
+            self.search_dialog.event_selected.connect(self.show_date)
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+        self.search_dialog.activateWindow()
+
+    @QtCore.pyqtSlot(object)
+    def show_date(self, date):
+
+        """
+        Sets a month of the date to the table
+        and selects the nearest event.
+
+        """
+        # get a model from the shedule
+        model = self.shedule.jump_to(date)
+        # set the model
+        self.set_model(model)
+        self.table.select_date(date)
+
+    @QtCore.pyqtSlot()
+    def on_date_clicked(self):
+
+        """
+        Opens a month of the date selected by user.
+
+        """
+        from theatre.DateDialog import DateDialog
+        model = self.table.model()
+        dialog = DateDialog(model.date, self)
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            self.show_date(dialog.date)
+
+    @QtCore.pyqtSlot()
+    def on_season_clicked(self):
+
+        """
+        Shows the season window.
+
+        """
+        from theatre.SeasonView import SeasonWindow
+        if self.season_window is None: # if the window has not been created yet
+            self.season_window = SeasonWindow(self.shedule, self)
+            self.season_window.event_selected.connect(self.show_date)
+        else:
+            self.season_window.on_show_clicked() # show recent changes
+        self.season_window.show()
+        self.season_window.raise_()
+        self.season_window.activateWindow()
+
+    @QtCore.pyqtSlot()
+    def on_stats_clicked(self):
+
+        """
+        Shows statistics of events.
+
+        """
+        from theatre.StatsDialog import StatsDialog
+        dialog = StatsDialog(self.shedule, self)
+        dialog.exec_()
+
+    @QtCore.pyqtSlot()
+    def on_sync_month_clicked(self):
+
+        """
+        Asks to sync the shown month.
+
+        """
+        self.sync_month_signal.emit('{:04}{:02}'.format(self.shedule.current_year, self.shedule.current_month))
 
     # signals from main menu to tray icon
 
@@ -437,6 +737,7 @@ class MainWindow(QtWidgets.QMainWindow):
         Adds a new event to the month.
 
         """
+        from theatre.EditDialog import EditDialog
         model = self.table.model()
         # create EditDialog without event
         dialog = EditDialog(model, parent=self)
@@ -450,6 +751,7 @@ class MainWindow(QtWidgets.QMainWindow):
         Edits selected event.
 
         """
+        from theatre.EditDialog import EditDialog
         model = self.table.model()
         # do nothing if there is no selected event
         if self.table.selected_event is None:
@@ -525,6 +827,7 @@ class MainWindow(QtWidgets.QMainWindow):
         Prints a shedule of the month.
 
         """
+        from theatre.Print import Print
         # create Print object
         printing = Print(self.table.model())
         try:
@@ -533,3 +836,64 @@ class MainWindow(QtWidgets.QMainWindow):
             # show message if an error has occurred
             msg_box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Critical, 'Print error', str(e), QtWidgets.QMessageBox.Ok, self)
             msg_box.show()
+
+    @QtCore.pyqtSlot()
+    def on_preview_clicked(self):
+
+        """
+        Shows a print preview of the month.
+
+        """
+        from theatre.PrintPreview import PrintPreviewDialog
+        model = self.table.model()
+        model.fetch_all() # all events are printed
+        if model.rowCount() == 0:
+            msg_box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Critical, 'Print error', 'Shedule is empty. Nothing to print.', QtWidgets.QMessageBox.Ok, self)
+            msg_box.show()
+            return
+        dialog = PrintPreviewDialog(model, self)
+        dialog.exec_()
+
+    @QtCore.pyqtSlot()
+    def on_export_clicked(self):
+
+        """
+        Exports all saved shedules to a file.
+
+        """
+        from theatre.Export import export
+        filename, selected = QtWidgets.QFileDialog.getSaveFileName(self, 'Export shedules', 'shedule.ics',
+                'iCalendar (*.ics);;CSV (*.csv)')
+        if not filename:
+            return
+        # a format of the selected filter is used for files without extension
+        fmt = 'csv' if filename.lower().endswith('.csv') or (not filename.lower().endswith('.ics') and 'csv' in selected) else 'ics'
+        try:
+            count = export(self.shedule.storage, filename, fmt)
+        except OSError as e:
+            msg_box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Critical, 'Export error', str(e), QtWidgets.QMessageBox.Ok, self)
+            msg_box.show()
+            return
+        self.statusBar().showMessage('Exported events: {}'.format(count), 5000)
+
+    @QtCore.pyqtSlot()
+    def on_import_clicked(self):
+
+        """
+        Imports shedules from a file.
+
+        """
+        from theatre.Import import import_file
+        filename, selected = QtWidgets.QFileDialog.getOpenFileName(self, 'Import shedules', '',
+                'Shedules (*.ics *.csv);;iCalendar (*.ics);;CSV (*.csv)')
+        if not filename:
+            return
+        try:
+            report = import_file(self.shedule, filename)
+        except (OSError, ValueError, KeyError) as e:
+            msg_box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Critical, 'Import error', str(e), QtWidgets.QMessageBox.Ok, self)
+            msg_box.show()
+            return
+        added = sum(counts[0] for counts in report.values())
+        changed = sum(counts[1] for counts in report.values())
+        self.statusBar().showMessage('Imported events: {} added, {} changed'.format(added, changed), 5000)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import multiprocessing
+import os
+import sys
+from datetime import datetime
+
+from theatre.Preferences import Preferences, DB_FILENAME
+
+# everything is rendered without a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5 import QtCore, QtGui
+
+from theatre.TheatreModel import Storage, Month, SortProxyModel
+from theatre.Print import Print
+
+RESOLUTION = 96 # Print uses sizes in screen pixels
+
+_app = None # the application object of the process
+
+def application():
+
+    """
+    Returns the application object, creates it if needed.
+    Fonts can't be measured without it.
+
+    """
+    global _app
+    if QtGui.QGuiApplication.instance() is None:
+        _app = QtGui.QGuiApplication(['theatre-pdf'])
+    return QtGui.QGuiApplication.instance()
+
+def pdf_writer(filename):
+
+    """
+    Creates a PDF writer with A4 pages.
+
+    """
+    writer = QtGui.QPdfWriter(filename)
+    writer.setPageSize(QtGui.QPageSize(QtGui.QPageSize.A4))
+    writer.setResolution(RESOLUTION)
+    writer.setCreator('Theatre Shedule Manager')
+    return writer
+
+def page_rect(writer):
+
+    """
+    Returns a paintable rect of the writer's page.
+
+    """
+    return QtCore.QRectF(writer.pageLayout().paintRectPixels(writer.resolution()))
+
+def load_month(storage, key):
+
+    """
+    Returns a model of the stored month.
+
+    """
+    month = SortProxyModel(Month(datetime.strptime(key, '%Y%m'), storage))
+    month.fetch_all()
+    return month
+
+def layout_month(job):
+
+    """
+    Lays out the month in a worker process.
+    Returns the key and a list of drawing commands
+    of each page or None if the month is empty.
+
+    """
+    db, key, rect = job
+    application()
+    storage = Storage(db, 'r')
+    try:
+        month = load_month(storage, key)
+        if month.rowCount() == 0:
+            return key, None
+        printing = Print(month)
+        printing.prepare(rect)
+        return key, list(printing.pages())
+    finally:
+        storage.close()
+
+def export_month(job):
+
+    """
+    Writes the month to a separate PDF file in a worker process.
+    Returns the filename or None if the month is empty.
+
+    """
+    db, key, filename = job
+    application()
+    storage = Storage(db, 'r')
+    try:
+        month = load_month(storage, key)
+        if month.rowCount() == 0:
+            return None
+        writer = pdf_writer(filename)
+        Print(month).print_to(writer, page_rect(writer))
+        return filename
+    finally:
+        storage.close()
+
+def export(db, keys, output, per_month=False, jobs=None):
+
+    """
+    Exports months to PDF using worker processes.
+
+    With per_month each month is written to the output
+    directory as YYYYMM.pdf. Otherwise workers lay out
+    months and all pages are written to the output file.
+
+    Returns a list of written files.
+
+    """
+    # Qt objects must not be inherited by workers
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(jobs) as pool:
+        if per_month:
+            os.makedirs(output, exist_ok=True)
+            files = pool.map(export_month, [(db, key, os.path.join(output, key + '.pdf')) for key in keys])
+            return [filename for filename in files if filename]
+        application()
+        writer = pdf_writer(output)
+        rect = page_rect(writer)
+        layouts = pool.map(layout_month, [(db, key, rect) for key in keys])
+
+    # replay all pages in one document
+    printing = Print(None)
+    assert printing.painter.begin(writer), "Can't open " + output
+    first = True
+    for key, pages in layouts:
+        if pages is None:
+            continue # nothing to print
+        for commands in pages:
+            if not first:
+                writer.newPage()
+            first = False
+            printing.replay(commands)
+    printing.painter.end()
+    return [output]
+
+def main(argv=None):
+
+    """
+    The command line entry point of PDF export.
+
+    """
+    current = datetime.today().strftime('%Y%m')
+    parser = argparse.ArgumentParser(description='Export theatre shedules to PDF')
+    parser.add_argument('--db', help='a path to the shedule database')
+    parser.add_argument('--from', dest='first', metavar='YYYYMM', default=current, help='the first month')
+    parser.add_argument('--to', dest='last', metavar='YYYYMM', help='the last month')
+    parser.add_argument('-o', '--output', help='an output file or a directory with --per-month')
+    parser.add_argument('--per-month', action='store_true', help='write a file for each month')
+    parser.add_argument('-j', '--jobs', type=int, help='a number of worker processes')
+    args = parser.parse_args(argv)
+
+    db = args.db or Preferences().at_home(DB_FILENAME)
+    last = args.last or args.first
+    storage = Storage(db, 'r')
+    keys = [key for key in storage.months() if args.first <= key <= last]
+    storage.close()
+    if not keys:
+        print('There are no shedules from {} to {}'.format(args.first, last), file=sys.stderr)
+        return 1
+
+    output = args.output or ('shedule' if args.per_month else 'shedule.pdf')
+    for filename in export(db, keys, output, args.per_month, args.jobs):
+        print(filename)
+    return 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ import os, platform
 from configparser import ConfigParser
 
 CONFIGFILE = 'config.ini' # configuration file name
+DB_FILENAME = 'shedule.db' # filename for database
 
 def is_windows():
 
@@ -41,7 +42,13 @@ class Preferences:
     """
     # default settings used if there is no configuration file
     # or its content is broken
-    DEFAULTS = {'SYNC': {'sync_interval': 3600}}
+    DEFAULTS = {'SYNC': {'sync_interval': 3600,   # the base interval between syncs, seconds
+                         'min_interval': 600,     # an interval after a sync found changes
+                         'max_interval': 21600,   # the longest interval when nothing changes
+                         'backoff_factor': 2.0,   # an interval grows so when nothing changes
+                         'jitter': 0.1,           # a random part of an interval
+                         'imminent_hours': 48,    # a performance is soon within these hours
+                         'archive_pages': 0}}     # 1 to keep downloaded pages for re-parsing
 
     def __init__(self):
         userdir = os.path.expanduser('~') # get user home directory
@@ -67,12 +74,19 @@ class Preferences:
                 self.config.read_file(configfile)
             # check existance of all options in all sections
             # in the config file
+            if not all(section in self.config for section in self.DEFAULTS):
+                # the config file is broken
+                raise KeyError
+            missing = False
             for section, options in self.DEFAULTS.items():
-                for option in options:
-                    # if an option not found in the config file
+                for option, value in options.items():
+                    # an option added in a newer version gets
+                    # its default value, other options are kept
                     if not option in self.config[section]:
-                        # the config file is broken
-                        raise KeyError
+                        self.config[section][option] = str(value)
+                        missing = True
+            if missing:
+                self.save()
         except:
             # if config file does not exist
             # or it is broken
@@ -2,7 +2,52 @@
 # -*- coding: utf-8 -*-
 
 from PyQt5 import QtCore, QtWidgets, QtGui, QtPrintSupport
-from datetime import datetime
+from collections import OrderedDict
+
+class TextMetrics:
+
+    """
+    Font metrics that measure each text only once.
+    Can be used instead of QFontMetrics in align functions.
+    Only limit recently used texts are kept, so the metrics
+    do not grow while the application is running.
+
+    """
+    limit = 2048 # a number of kept bounding rects
+
+    def __init__(self, font):
+        self.fm = QtGui.QFontMetrics(font)
+        self._ascent = self.fm.ascent()
+        self.rects = OrderedDict() # bounding rects of measured texts
+
+    def boundingRect(self, text):
+        rect = self.rects.get(text)
+        if rect is None:
+            rect = self.rects[text] = self.fm.boundingRect(text)
+            if len(self.rects) > self.limit:
+                # forget the least recently used text
+                self.rects.popitem(last=False)
+        else:
+            self.rects.move_to_end(text)
+        return rect
+
+    def ascent(self):
+        return self._ascent
+
+# metrics of used fonts, texts like times and titles
+# repeat in all months, so measurements are reused
+_metrics = {}
+
+def metrics(font):
+
+    """
+    Returns cached metrics of the font.
+
+    """
+    key = font.key()
+    if key not in _metrics:
+        _metrics[key] = TextMetrics(font)
+    return _metrics[key]
 
 def align_left(text, fm, indent, height, x_offset=0, y_offset=0):
 
@@ -36,9 +81,17 @@ class Print():
     """
     Prints shedule of a month.
 
+    Events are split into pages between days. Each page
+    is laid out into a list of drawing commands, that are
+    replayed on the printer before the next page is made.
+    Commands contain only picklable objects, so they can be
+    made in another process.
+
     """
     header_height = 40.0 # a height of a header (month + year)
     line_width = 1.001 # a width of grid lines
+    max_row_height = 50.0 # rows are not higher than this
+    min_row_height = 25.0 # and not smaller, otherwise next page is used
 
     def __init__(self, month, parent=None):
         self.month = month
@@ -46,6 +99,9 @@ class Print():
         self.painter = QtGui.QPainter()
         self.pageRect = None
         self.row_height = 0
+        self.rows_per_page = 0
+        self.header_font = QtGui.QFont('Times New Roman', 16)
+        self.events_font = QtGui.QFont('Times New Roman', 14)
 
     def print_month(self):
 
@@ -53,6 +109,7 @@ class Print():
         Prints a month's shedule
 
         """
+        self.month.fetch_all() # all events are printed
         # there should be at least one event
         assert self.month.rowCount() > 0, "Shedule is empty. Nothing to print."
         # open print dialog
@@ -60,91 +117,163 @@ class Print():
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
             # get printer
             printer = dialog.printer()
-            # error if printing impossible
-            assert self.painter.begin(printer), "Can't open printer."
-            self.pageRect = printer.pageRect() # get page rect
-            # calculate a height of each row, maximum height is 50
-            self.row_height = min((self.pageRect.height() - self.header_height) / self.month.rowCount(), 50.0)
-            self.table_height = self.row_height * self.month.rowCount() # a height of the shedule table
-            pen = QtGui.QPen(1) # solid pen
-            pen.setWidthF(self.line_width)
-            self.painter.setPen(pen)
-            self.draw_header() # print a header
-            self.draw_grid() # print a grid
-            self.draw_events() # print events
-            self.painter.end() # done
+            self.print_to(printer, printer.pageRect())
+
+    def print_to(self, device, pageRect):
+
+        """
+        Prints a month's shedule on the device
+        (a printer or a PDF writer).
+
+        """
+        # error if printing impossible
+        assert self.painter.begin(device), "Can't open printer."
+        self.prepare(pageRect) # compute a size of rows
+        for number, commands in enumerate(self.pages()):
+            if number > 0:
+                device.newPage()
+            self.replay(commands) # draw the page
+        self.painter.end() # done
+
+    def prepare(self, pageRect):
+
+        """
+        Computes a size of rows and a number of rows on a page.
+
+        """
+        self.pageRect = pageRect # get page rect
+        space = self.pageRect.height() - self.header_height
+        # rows fill the page, but they should be readable
+        self.row_height = max(min(space / self.month.rowCount(), self.max_row_height), self.min_row_height)
+        self.rows_per_page = max(int(space // self.row_height), 1)
 
-    def draw_header(self):
+    def days(self):
 
         """
-        Draws a page header that consists of
-        a name of the month and a year.
+        Yields lists of events of each day.
+
+        """
+        day = []
+        for event in self.month:
+            if day and day[-1].date.day != event.date.day:
+                yield day
+                day = []
+            day.append(event)
+        if day:
+            yield day
+
+    def pages(self):
+
+        """
+        Yields drawing commands of each page.
+        Pages are broken between days, only a day
+        longer than a page is broken between events.
+
+        """
+        page = [] # events of the current page
+        number = 1 # a number of the current page
+        for day in self.days():
+            if page and len(page) + len(day) > self.rows_per_page:
+                # the day does not fit, it begins the next page
+                yield self.layout(page, number)
+                number += 1
+                page = []
+            while len(day) > self.rows_per_page:
+                yield self.layout(day[:self.rows_per_page], number)
+                number += 1
+                day = day[self.rows_per_page:]
+            page += day
+        if page:
+            yield self.layout(page, number)
+
+    def layout(self, events, number=1):
+
+        """
+        Returns drawing commands of the page with the events.
+
+        """
+        commands = []
+        self.layout_header(commands, number)
+        self.layout_table(commands, events)
+        return commands
+
+    def replay(self, commands):
+
+        """
+        Draws the commands made by layout.
+
+        """
+        pen = QtGui.QPen(1) # solid pen
+        pen.setWidthF(self.line_width)
+        self.painter.setPen(pen)
+        for command in commands:
+            kind = command[0]
+            if kind == 'text':
+                self.painter.drawText(command[1], command[2])
+            elif kind == 'line':
+                self.painter.drawLine(command[1])
+            elif kind == 'rect':
+                self.painter.drawRect(command[1])
+            elif kind == 'font':
+                # fonts are referred by names of attributes
+                self.painter.setFont(getattr(self, command[1]))
+
+    def layout_header(self, commands, number):
+
+        """
+        Lays out a page header that consists of
+        a name of the month, a year and a number
+        of the page if the month takes many pages.
 
         """
         # text to print
         text = self.month.date.strftime('%B %Y').upper()
-        # select a font
-        font = QtGui.QFont('Times New Roman', 16)
-        fm = QtGui.QFontMetrics(font)
-        self.painter.setFont(font)
+        if number > 1:
+            text += ' ({})'.format(number)
+        fm = metrics(self.header_font)
+        commands.append(('font', 'header_font'))
         # print center-aligned text
-        self.painter.drawText(align_center(text, fm, self.pageRect.width(), self.header_height), text)
+        commands.append(('text', align_center(text, fm, self.pageRect.width(), self.header_height), text))
 
-    def draw_grid(self):
+    def layout_table(self, commands, events):
 
         """
-        Draws a grid of the table.
+        Lays out a grid of the table and a data of events.
 
         """
+        width = self.pageRect.width()
+        table_height = self.row_height * len(events) # a height of the shedule table
+        top = self.header_height
+        bottom = self.header_height + table_height
         # print outer lines
-        self.painter.drawRect(QtCore.QRectF(0.0, self.header_height, self.pageRect.width(), self.table_height))
+        commands.append(('rect', QtCore.QRectF(0.0, top, width, table_height)))
         # print vertical lines (column separators)
-        self.painter.drawLine(QtCore.QLineF(70.0, self.header_height, 70.0, self.header_height + self.table_height))
-        self.painter.drawLine(QtCore.QLineF(140.0, self.header_height, 140.0, self.header_height + self.table_height))
-        self.painter.drawLine(QtCore.QLineF(self.pageRect.width() - 70.0, self.header_height, self.pageRect.width() - 70.0, self.header_height + self.table_height))
-        # draw horizontal lines between all days
-        # do not draw lines between evens at the same day
-        it = iter(self.month) # get month's iterator
-        prev_event = next(it) # save first event as previous
-        # and begin from the second event to pre-last
-        # do not draw a line after the last event
-        for y in range(1, self.month.rowCount()):
-            event = next(it) # get event
-            if prev_event.date.day == event.date.day:
-                # skip an event if its date is the same
-                # as in the previous event
-                continue
-            prev_event = event # save the event as previous
-            # calculate y coordinate above a row with the event
-            y_pos = y * self.row_height + self.header_height
-            # draw a line
-            self.painter.drawLine(QtCore.QLineF(0.0, y_pos, self.pageRect.width(), y_pos))
-
-    def draw_events(self):
-
-        """
-        Draws a data of events.
-
-        """
+        commands.append(('line', QtCore.QLineF(70.0, top, 70.0, bottom)))
+        commands.append(('line', QtCore.QLineF(140.0, top, 140.0, bottom)))
+        commands.append(('line', QtCore.QLineF(width - 70.0, top, width - 70.0, bottom)))
         # select a font
-        font = QtGui.QFont('Times New Roman', 14)
-        fm = QtGui.QFontMetrics(font)
-        self.painter.setFont(font)
+        fm = metrics(self.events_font)
+        commands.append(('font', 'events_font'))
         # start from the bottom of the header
-        y_pos = self.header_height
+        y_pos = top
         prev_event = None # initially there is no previous event
-        for event in self.month:
+        for event in events:
             # only for new days
             if prev_event is None or prev_event.date.day != event.date.day:
+                if prev_event is not None:
+                    # draw horizontal lines between days, but do not draw
+                    # lines between evens at the same day and after the last event
+                    commands.append(('line', QtCore.QLineF(0.0, y_pos, width, y_pos)))
                 # print a date
                 prev_event = event
                 date = event.date.strftime('%d %a')
-                self.painter.drawText(align_left(date, fm, 7.0, self.row_height, y_offset=y_pos), date)
+                commands.append(('text', align_left(date, fm, 7.0, self.row_height, y_offset=y_pos), date))
             time = event.date.strftime('%H:%M') # time format
             # print a time center-aligned
-            self.painter.drawText(align_center(time, fm, 70.0, self.row_height, x_offset=70.0, y_offset=y_pos), time)
+            commands.append(('text', align_center(time, fm, 70.0, self.row_height, x_offset=70.0, y_offset=y_pos), time))
             # print a title left-aligned with 15.0 indent
-            self.painter.drawText(align_left(event.title, fm, 15.0, self.row_height, x_offset=140.0, y_offset=y_pos), event.title)
+            commands.append(('text', align_left(event.title, fm, 15.0, self.row_height, x_offset=140.0, y_offset=y_pos), event.title))
             # print people center-aligned
-            self.painter.drawText(align_center(event.people, fm, 70.0, self.row_height, x_offset=self.pageRect.width() - 70.0, y_offset=y_pos), event.people)
+            people = event.people or ''
+            commands.append(('text', align_center(people, fm, 70.0, self.row_height, x_offset=width - 70.0, y_offset=y_pos), people))
             y_pos += self.row_height # go to the next row
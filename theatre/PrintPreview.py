@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtCore, QtWidgets, QtGui, QtPrintSupport
+from collections import OrderedDict
+
+from theatre.Print import Print
+
+class PageCache:
+
+    """
+    Rendered pages of months. Pages are found by the month,
+    a digest of its events, the filter and the page setup, so they are
+    rendered again only when something of them changes.
+
+    """
+    size = 64 # a maximum number of cached pages
+
+    def __init__(self):
+        self.pages = OrderedDict() # key -> a list of pixmaps
+
+    def get(self, key):
+        pages = self.pages.get(key)
+        if pages is not None:
+            self.pages.move_to_end(key)
+        return pages
+
+    def put(self, key, pages):
+        self.pages[key] = pages
+        # forget the least recently used months
+        while sum(len(pages) for pages in self.pages.values()) > self.size and len(self.pages) > 1:
+            self.pages.popitem(last=False)
+
+# rendered pages are shared by all previews
+page_cache = PageCache()
+
+def page_setup(printer):
+
+    """
+    Returns a hashable description of the printer's page setup.
+
+    """
+    layout = printer.pageLayout()
+    rect = printer.pageRect()
+    return (layout.pageSize().id(), layout.orientation(), printer.resolution(),
+            rect.x(), rect.y(), rect.width(), rect.height())
+
+
+
+class PrintPreviewDialog(QtWidgets.QDialog):
+
+    """
+    Shows how the month will be printed.
+
+    """
+    scale = 2 # pages are rendered with a higher density for zooming
+
+    def __init__(self, month, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+
+        self.setWindowTitle('Print preview - ' + month.date.strftime('%B %Y'))
+        self.resize(700, 800)
+        self.month = month
+        self.printer = QtPrintSupport.QPrinter()
+
+        # create a preview widget, it asks for pages when they are needed
+        self.preview = QtPrintSupport.QPrintPreviewWidget(self.printer)
+        self.preview.paintRequested.connect(self.on_paint_requested)
+        self.preview.previewChanged.connect(self.on_preview_changed)
+
+        # create a tool bar
+        toolbar = QtWidgets.QToolBar()
+        toolbar.addAction(QtGui.QIcon.fromTheme('zoom-fit-best'), 'Fit width', self.preview.fitToWidth)
+        toolbar.addAction(QtGui.QIcon.fromTheme('zoom-in'), 'Zoom in', lambda: self.preview.zoomIn())
+        toolbar.addAction(QtGui.QIcon.fromTheme('zoom-out'), 'Zoom out', lambda: self.preview.zoomOut())
+        toolbar.addSeparator()
+        toolbar.addAction(QtGui.QIcon.fromTheme('previous'), 'Previous page',
+                          lambda: self.preview.setCurrentPage(self.preview.currentPage() - 1))
+        self.pageLabel = QtWidgets.QLabel('')
+        toolbar.addWidget(self.pageLabel)
+        toolbar.addAction(QtGui.QIcon.fromTheme('next'), 'Next page',
+                          lambda: self.preview.setCurrentPage(self.preview.currentPage() + 1))
+        toolbar.addSeparator()
+        toolbar.addAction(QtGui.QIcon.fromTheme('document-page-setup'), 'Page setup', self.on_page_setup)
+        toolbar.addAction(QtGui.QIcon.fromTheme('fileprint'), 'Print', self.on_print)
+
+        # add widgets to main layout
+        mainBox = QtWidgets.QVBoxLayout()
+        mainBox.addWidget(toolbar)
+        mainBox.addWidget(self.preview)
+
+        # set layout to the window
+        self.setLayout(mainBox)
+
+    def rendered_pages(self, printer):
+
+        """
+        Returns pixmaps of pages for the printer,
+        renders them if they are not cached.
+
+        """
+        # the filter of the table changes printed rows
+        event_filter = self.month.event_filter
+        conditions = None if event_filter is None or event_filter.is_empty() else event_filter.key()
+        key = (self.month.key, self.month.fingerprint(), conditions, page_setup(printer))
+        pages = page_cache.get(key)
+        if pages is None:
+            pages = []
+            printing = Print(self.month)
+            rect = printer.pageRect()
+            printing.prepare(QtCore.QRectF(0, 0, rect.width(), rect.height()))
+            for commands in printing.pages():
+                pixmap = QtGui.QPixmap(rect.width() * self.scale, rect.height() * self.scale)
+                pixmap.setDevicePixelRatio(self.scale)
+                pixmap.fill(QtCore.Qt.white)
+                printing.painter.begin(pixmap)
+                printing.painter.setRenderHint(QtGui.QPainter.Antialiasing)
+                printing.painter.setRenderHint(QtGui.QPainter.TextAntialiasing)
+                printing.replay(commands)
+                printing.painter.end()
+                pages.append(pixmap)
+            page_cache.put(key, pages)
+        return pages
+
+    @QtCore.pyqtSlot('QPrinter*')
+    def on_paint_requested(self, printer):
+
+        """
+        Called when the preview needs pages.
+
+        """
+        painter = QtGui.QPainter(printer)
+        # thin lines should not disappear when pages are zoomed out
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        for number, pixmap in enumerate(self.rendered_pages(printer)):
+            if number > 0:
+                printer.newPage()
+            painter.drawPixmap(QtCore.QPointF(0, 0), pixmap)
+        painter.end()
+
+    @QtCore.pyqtSlot()
+    def on_preview_changed(self):
+
+        """
+        Called when the preview has been changed.
+
+        """
+        self.pageLabel.setText(' {} / {} '.format(self.preview.currentPage(), self.preview.pageCount()))
+
+    @QtCore.pyqtSlot()
+    def on_page_setup(self):
+
+        """
+        Changes the page setup.
+
+        """
+        dialog = QtPrintSupport.QPageSetupDialog(self.printer, self)
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            self.preview.updatePreview()
+
+    @QtCore.pyqtSlot()
+    def on_print(self):
+
+        """
+        Prints the month with the current page setup.
+
+        """
+        dialog = QtPrintSupport.QPrintDialog(self.printer, self)
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            # print vector pages, not rendered pixmaps
+            Print(self.month).print_to(self.printer, self.printer.pageRect())
+            self.accept()
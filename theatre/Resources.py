@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+
+import os
+
+# path where script is located
+CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
+
+# path to default application icon
+ICON_DEFAULT = os.sep.join([CURRENT_PATH, 'icons', 'icon.png'])
+# path to application icon used when there are updates
+ICON_NEW = os.sep.join([CURRENT_PATH, 'icons', 'icon_new.png'])
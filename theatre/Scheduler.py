@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+from datetime import datetime, timedelta
+
+from theatre.Preferences import Preferences
+
+def next_performance(events, now=None):
+
+    """
+    Returns the date of the nearest future event
+    in the dictionary YYYYMM -> a list of events
+    or None if there are no future events.
+
+    """
+    if now is None:
+        now = datetime.now()
+    dates = [event.date for month in events.values() for event in month if event.date >= now]
+    return min(dates) if dates else None
+
+
+
+class SyncScheduler:
+
+    """
+    Chooses a delay before the next synchronization.
+
+    A sync that found changes brings the delay down to min_interval,
+    a sync without changes or a failed one multiplies the delay by
+    backoff_factor up to max_interval. When the nearest performance
+    is within imminent_hours, the delay is limited by a value that
+    shrinks linearly from sync_interval at imminent_hours before
+    the performance to min_interval at its start. The delay
+    is randomly changed by up to a jitter part of it.
+
+    """
+    def __init__(self, sync_interval=3600, min_interval=600, max_interval=21600,
+                 backoff_factor=2.0, jitter=0.1, imminent_hours=48):
+        self.sync_interval = sync_interval
+        # the base interval is the upper limit of the shortest one
+        self.min_interval = min(min_interval, sync_interval)
+        self.max_interval = max(max_interval, sync_interval)
+        self.backoff_factor = max(backoff_factor, 1.0)
+        self.jitter = jitter
+        self.imminent = timedelta(hours=imminent_hours)
+        self.interval = sync_interval # the delay without jitter
+        self.performance = None # the nearest known performance
+
+    @classmethod
+    def from_preferences(cls):
+
+        """
+        Creates a scheduler with options of the SYNC section.
+
+        """
+        prefs = Preferences()
+        options = {}
+        for option in ('sync_interval', 'min_interval', 'max_interval',
+                       'backoff_factor', 'jitter', 'imminent_hours'):
+            options[option] = prefs['SYNC'][option]
+        return cls(**options)
+
+    def is_imminent(self, now=None):
+
+        """
+        Returns True if the nearest performance is soon.
+
+        """
+        if self.performance is None:
+            return False
+        if now is None:
+            now = datetime.now()
+        return now <= self.performance <= now + self.imminent
+
+    def imminent_interval(self, now=None):
+
+        """
+        Returns the longest interval while the nearest performance
+        is soon or None if it is not.
+
+        """
+        if not self.is_imminent(now):
+            return None
+        if now is None:
+            now = datetime.now()
+        # a part of imminent_hours left before the performance
+        part = (self.performance - now) / self.imminent if self.imminent else 0.0
+        return self.min_interval + (self.sync_interval - self.min_interval) * part
+
+    def completed(self, changed, events=None, now=None):
+
+        """
+        Remembers the result of a sync and returns the next delay
+        in seconds. events are downloaded events used to find
+        the nearest performance.
+
+        """
+        if events is not None:
+            self.performance = next_performance(events, now)
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+        return self.delay(now)
+
+    def failed(self, now=None):
+
+        """
+        Remembers a failed sync and returns the next delay in seconds.
+
+        """
+        self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+        return self.delay(now)
+
+    def delay(self, now=None):
+
+        """
+        Returns the delay before the next sync in seconds.
+
+        """
+        interval = self.interval
+        limit = self.imminent_interval(now)
+        if limit is not None:
+            interval = min(interval, limit)
+        interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(int(interval), 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, insort
+import re
+
+# a pattern of words in titles and people
+WORD = re.compile(r'\w+')
+
+def normalize(text):
+
+    """
+    Returns a case-insensitive form of the text.
+    Cyrillic 'ё' is treated as 'е'.
+
+    """
+    return text.casefold().replace('ё', 'е')
+
+def tokenize(text):
+
+    """
+    Splits the text to normalized words.
+
+    """
+    if not text:
+        return []
+    return WORD.findall(normalize(text))
+
+
+
+class SearchIndex:
+
+    """
+    An inverted index over titles and people of events
+    in all months. Supports case-insensitive prefix search.
+
+    """
+    fields = ('title', 'people') # indexed attributes of events
+
+    def __init__(self):
+        self.events = {} # indexed events of each month
+        # every field has own postings: a token -> a set of
+        # (month key, number of the event in the month)
+        self.postings = {field: {} for field in self.fields}
+        # and a sorted list of tokens for prefix search
+        self.tokens = {field: [] for field in self.fields}
+
+    def update_month(self, key, events):
+
+        """
+        Replaces indexed events of the month.
+
+        """
+        self.remove_month(key)
+        events = list(events)
+        self.events[key] = events
+        for number, event in enumerate(events):
+            for field in self.fields:
+                postings = self.postings[field]
+                for token in set(tokenize(getattr(event, field))):
+                    if token not in postings:
+                        # a new token, keep the list sorted
+                        postings[token] = set()
+                        insort(self.tokens[field], token)
+                    postings[token].add((key, number))
+
+    def remove_month(self, key):
+
+        """
+        Removes all events of the month from the index.
+
+        """
+        events = self.events.pop(key, [])
+        for number, event in enumerate(events):
+            for field in self.fields:
+                postings = self.postings[field]
+                for token in set(tokenize(getattr(event, field))):
+                    refs = postings.get(token)
+                    if refs is None:
+                        continue
+                    refs.discard((key, number))
+                    if not refs:
+                        # nothing refers to the token anymore
+                        del postings[token]
+                        tokens = self.tokens[field]
+                        del tokens[bisect_left(tokens, token)]
+
+    def lookup(self, prefix, field):
+
+        """
+        Returns references to events that have a word
+        starting with the prefix in the field.
+
+        """
+        tokens = self.tokens[field]
+        postings = self.postings[field]
+        found = set()
+        # tokens with the same prefix are neighbours in the sorted list
+        i = bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            found |= postings[tokens[i]]
+            i += 1
+        return found
+
+    def search(self, query, fields=None):
+
+        """
+        Returns events matching all words of the query
+        sorted by date. Each word matches as a prefix.
+        By default searches both in titles and people.
+
+        """
+        fields = fields or self.fields
+        result = None
+        for word in tokenize(query):
+            found = set()
+            for field in fields:
+                found |= self.lookup(word, field)
+            result = found if result is None else result & found
+            if not result:
+                break # no need to check other words
+        if not result:
+            return []
+        events = [self.events[key][number] for key, number in result]
+        events.sort(key=lambda event: event.date)
+        return events
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtCore, QtWidgets, QtGui
+
+from theatre.TheatreModel import event_row
+
+class SearchDialog(QtWidgets.QDialog):
+
+    """
+    Searches events by titles and people in all months.
+
+    """
+    # a signal emitted when user activated a found event,
+    # sends a datetime object of the event
+    event_selected = QtCore.pyqtSignal(object)
+
+    def __init__(self, shedule, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+
+        self.setWindowTitle('Search events')
+        self.setMinimumSize(500, 400)
+        self.shedule = shedule
+
+        # create widgets
+        self.queryEdit = QtWidgets.QLineEdit()
+        self.queryEdit.setPlaceholderText('Title or people')
+        self.fieldEdit = QtWidgets.QComboBox()
+        self.fieldEdit.addItem('Everywhere', None)
+        self.fieldEdit.addItem('Titles', ('title',))
+        self.fieldEdit.addItem('People', ('people',))
+        self.countLabel = QtWidgets.QLabel('')
+
+        # a table of found events
+        self.results = QtGui.QStandardItemModel(self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.results)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.clear_results()
+
+        # search while typing
+        self.queryEdit.textChanged.connect(self.on_query_changed)
+        self.fieldEdit.currentIndexChanged.connect(self.on_query_changed)
+        # open a month of the event on double click
+        self.table.doubleClicked.connect(self.on_result_activated)
+
+        # attach widgets to layout
+        queryBox = QtWidgets.QHBoxLayout()
+        queryBox.addWidget(self.queryEdit)
+        queryBox.addWidget(self.fieldEdit)
+
+        # create control buttons
+        self.closeBtn = QtWidgets.QPushButton('Close')
+        self.closeBtn.clicked.connect(self.reject)
+
+        # add buttons to layout
+        btnBox = QtWidgets.QHBoxLayout()
+        btnBox.addWidget(self.countLabel)
+        btnBox.addStretch()
+        btnBox.addWidget(self.closeBtn)
+
+        # add layouts to main layout
+        mainBox = QtWidgets.QVBoxLayout()
+        mainBox.addLayout(queryBox)
+        mainBox.addWidget(self.table)
+        mainBox.addLayout(btnBox)
+
+        # set layout to the window
+        self.setLayout(mainBox)
+
+    def clear_results(self):
+
+        """
+        Removes all found events from the table.
+
+        """
+        self.results.clear()
+        self.results.setHorizontalHeaderLabels(['Date', 'Time', 'Title', 'Who'])
+        self.table.setColumnWidth(0, 110)
+        self.table.setColumnWidth(1, 60)
+        self.table.setColumnWidth(2, 230)
+
+    @QtCore.pyqtSlot()
+    def on_query_changed(self):
+
+        """
+        Called when the query or searched field has been changed.
+
+        """
+        self.clear_results()
+        query = self.queryEdit.text()
+        if not query.strip():
+            self.countLabel.setText('')
+            return
+        events = self.shedule.search(query, self.fieldEdit.currentData())
+        for event in events:
+            row = event_row(event)
+            # the results contain events of different months
+            row[0].setText(event.date.strftime('%d.%m.%Y %a'))
+            self.results.appendRow(row)
+        self.countLabel.setText('Found: {}'.format(len(events)))
+
+    @QtCore.pyqtSlot('QModelIndex')
+    def on_result_activated(self, index):
+
+        """
+        Called when user activated a found event.
+
+        """
+        date = self.results.index(index.row(), 0).data(QtCore.Qt.UserRole + 1)
+        self.event_selected.emit(date)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtCore, QtWidgets
+from collections import OrderedDict
+from bisect import bisect_right
+from datetime import datetime
+
+from theatre.Statistics import season_range
+
+def month_keys(first, last):
+
+    """
+    Returns keys (YYYYMM) of all months
+    from the first to the last date.
+
+    """
+    keys = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        keys.append('{0}{1:0>2}'.format(year, month))
+        month += 1
+        if month > 12:
+            month = 1
+            year += 1
+    return keys
+
+
+
+class SeasonModel(QtCore.QAbstractTableModel):
+
+    """
+    A read-only model of events of a range of months.
+    Events are read from the shedule when a view asks
+    for them, only visible months and one month on each
+    side of them are kept in memory (see set_visible_rows).
+
+    """
+    resident_months = 3 # the least number of months kept in memory
+    header = ['Date', 'Time', 'Title', 'Who']
+
+    def __init__(self, shedule, first, last, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self.shedule = shedule
+        self.keys = month_keys(first, last)
+        # offsets[i] is a number of the first row of month keys[i],
+        # the last item is a total number of rows
+        self.offsets = [0]
+        for key in self.keys:
+            self.offsets.append(self.offsets[-1] + shedule.month_size(key))
+        self.resident = OrderedDict() # recently used months
+        self.resident_limit = self.resident_months # grows with visible months
+        self.alignment = QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.offsets[-1]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.header)
+
+    def month_events(self, key):
+
+        """
+        Returns events of the month, reads them
+        from the shedule if they are not resident.
+
+        """
+        if key in self.resident:
+            self.resident.move_to_end(key)
+        else:
+            self.resident[key] = self.shedule.read_events(key)
+            if len(self.resident) > self.resident_limit:
+                # forget the least recently used month
+                self.resident.popitem(last=False)
+        return self.resident[key]
+
+    def set_visible_rows(self, first, last):
+
+        """
+        Keeps months of the visible rows from first to last
+        and one month on each side of them in memory,
+        so scrolling does not read months for each cell.
+
+        """
+        months = bisect_right(self.offsets, last) - bisect_right(self.offsets, first) + 1
+        self.resident_limit = max(months + 2, self.resident_months)
+
+    def row_event(self, row):
+
+        """
+        Returns an Event object of the row.
+
+        """
+        # find a month containing the row
+        month = bisect_right(self.offsets, row) - 1
+        events = self.month_events(self.keys[month])
+        number = row - self.offsets[month]
+        if number < len(events):
+            return events[number]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if role == QtCore.Qt.TextAlignmentRole:
+            if column in (1, 3):
+                return self.alignment
+            return None
+        if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.UserRole + 1):
+            return None
+        event = self.row_event(index.row())
+        if event is None:
+            return None
+        if role == QtCore.Qt.UserRole + 1:
+            # the same roles as in Month: datetime and hashsum
+            if column == 0:
+                return event.date
+            if column == 2:
+                return event.hash
+            return None
+        if column == 0:
+            return event.date.strftime('%d.%m %a')
+        if column == 1:
+            return event.date.strftime('%H:%M')
+        if column == 2:
+            return event.title
+        return event.people
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.header[section]
+        return None
+
+    def month_row(self, key):
+
+        """
+        Returns a number of the first row of the month.
+
+        """
+        return self.offsets[self.keys.index(key)]
+
+
+
+class SeasonWindow(QtWidgets.QDialog):
+
+    """
+    Shows events of a range of months in one table.
+
+    """
+    # a signal emitted when user activated an event,
+    # sends a datetime object of the event
+    event_selected = QtCore.pyqtSignal(object)
+
+    def __init__(self, shedule, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+
+        self.setWindowTitle('Season')
+        self.resize(600, 600)
+        self.shedule = shedule
+
+        # the current season is shown by default
+        today = datetime.today()
+        first, last = season_range(today.year if today.month >= 9 else today.year - 1)
+
+        # create widgets for the range of months
+        self.fromEdit = QtWidgets.QDateEdit(QtCore.QDate.fromString(first, 'yyyyMM'))
+        self.fromEdit.setDisplayFormat('MMMM yyyy')
+        self.toEdit = QtWidgets.QDateEdit(QtCore.QDate.fromString(last, 'yyyyMM'))
+        self.toEdit.setDisplayFormat('MMMM yyyy')
+        self.showBtn = QtWidgets.QPushButton('Show')
+        self.showBtn.clicked.connect(self.on_show_clicked)
+
+        # create table view, all rows have the same height
+        # so the view does not need to measure them
+        self.table = QtWidgets.QTableView()
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.doubleClicked.connect(self.on_event_activated)
+        # the model keeps visible months in memory
+        self.table.verticalScrollBar().valueChanged.connect(self.on_viewport_changed)
+        self.table.verticalScrollBar().rangeChanged.connect(self.on_viewport_changed)
+
+        # attach widgets to layout
+        rangeBox = QtWidgets.QHBoxLayout()
+        rangeBox.addWidget(QtWidgets.QLabel('From'))
+        rangeBox.addWidget(self.fromEdit)
+        rangeBox.addWidget(QtWidgets.QLabel('to'))
+        rangeBox.addWidget(self.toEdit)
+        rangeBox.addWidget(self.showBtn)
+        rangeBox.addStretch()
+
+        # add layouts to main layout
+        mainBox = QtWidgets.QVBoxLayout()
+        mainBox.addLayout(rangeBox)
+        mainBox.addWidget(self.table)
+
+        # set layout to the window
+        self.setLayout(mainBox)
+        self.on_show_clicked()
+
+    @QtCore.pyqtSlot()
+    def on_show_clicked(self):
+
+        """
+        Shows events of the selected range of months.
+
+        """
+        first = self.fromEdit.date().toPyDate()
+        last = self.toEdit.date().toPyDate()
+        model = SeasonModel(self.shedule, first, last, self)
+        old_model = self.table.model()
+        self.table.setModel(model)
+        if old_model is not None:
+            old_model.deleteLater()
+        self.table.setColumnWidth(0, 90)
+        self.table.setColumnWidth(1, 60)
+        self.table.setColumnWidth(2, 350)
+        self.on_viewport_changed()
+        # scroll to the current month if it's in the range
+        key = datetime.today().strftime('%Y%m')
+        if key in model.keys and model.rowCount() > 0:
+            row = min(model.month_row(key), model.rowCount() - 1)
+            self.table.scrollTo(model.index(row, 0), QtWidgets.QAbstractItemView.PositionAtTop)
+
+    def resizeEvent(self, event):
+        QtWidgets.QDialog.resizeEvent(self, event)
+        self.on_viewport_changed()
+
+    @QtCore.pyqtSlot()
+    def on_viewport_changed(self):
+
+        """
+        Called when the table is scrolled or resized.
+        Passes the range of visible rows to the model.
+
+        """
+        model = self.table.model()
+        if model is None or model.rowCount() == 0:
+            return
+        first = self.table.rowAt(0)
+        last = self.table.rowAt(self.table.viewport().height() - 1)
+        # rows after the end of the table are not visible
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = model.rowCount() - 1
+        model.set_visible_rows(first, last)
+
+    @QtCore.pyqtSlot('QModelIndex')
+    def on_event_activated(self, index):
+
+        """
+        Called when user activated an event.
+
+        """
+        date = self.table.model().index(index.row(), 0).data(QtCore.Qt.UserRole + 1)
+        if date is not None:
+            self.event_selected.emit(date)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+import re
+
+# separators of names in the people field
+SEPARATOR = re.compile(r'[,;]')
+
+def split_people(people):
+
+    """
+    Returns a list of names in the people field.
+
+    """
+    if not people:
+        return []
+    return [name.strip() for name in SEPARATOR.split(people) if name.strip()]
+
+def season_range(year):
+
+    """
+    Returns keys of the first and the last months
+    of the theatre season starting in the year.
+
+    """
+    return ('{}09'.format(year), '{}08'.format(year + 1))
+
+def season_of(key):
+
+    """
+    Returns the year when the season of the month (YYYYMM) started.
+
+    """
+    year, month = int(key[:4]), int(key[4:])
+    # months before September belong to the previous season
+    return year if month >= 9 else year - 1
+
+
+
+class Aggregates:
+
+    """
+    Counts of events per person, per title and per month.
+    Updated incrementally when months are changed.
+    Counts of each season are kept as well, so a query
+    of a season range does not look at its months.
+
+    """
+    def __init__(self):
+        self.months = {} # contribution of each month: (people, titles, count)
+        self.people = Counter() # total counts of events per person
+        self.titles = Counter() # total counts of events per title
+        # counts per month for each person and each title
+        self.people_months = {}
+        self.titles_months = {}
+        # counts per person and per title in each season
+        # and numbers of counted months of the season
+        self.people_seasons = {}
+        self.titles_seasons = {}
+        self.season_months = Counter()
+
+    def update_month(self, key, events):
+
+        """
+        Replaces counted events of the month.
+
+        """
+        self.remove_month(key)
+        people = Counter()
+        titles = Counter()
+        count = 0
+        for event in events:
+            count += 1
+            titles[event.title] += 1
+            for name in split_people(event.people):
+                people[name] += 1
+        self.months[key] = (people, titles, count)
+        self._add(people, self.people, self.people_months, key)
+        self._add(titles, self.titles, self.titles_months, key)
+        year = season_of(key)
+        self.people_seasons.setdefault(year, Counter()).update(people)
+        self.titles_seasons.setdefault(year, Counter()).update(titles)
+        self.season_months[year] += 1
+
+    def remove_month(self, key):
+
+        """
+        Removes counts of the month.
+
+        """
+        if key not in self.months:
+            return
+        people, titles, count = self.months.pop(key)
+        self._subtract(people, self.people, self.people_months, key)
+        self._subtract(titles, self.titles, self.titles_months, key)
+        year = season_of(key)
+        self._subtract_season(people, self.people_seasons, year)
+        self._subtract_season(titles, self.titles_seasons, year)
+        self.season_months[year] -= 1
+        if not self.season_months[year]:
+            del self.season_months[year]
+
+    @staticmethod
+    def _add(counts, totals, by_month, key):
+        totals.update(counts)
+        for name, count in counts.items():
+            by_month.setdefault(name, {})[key] = count
+
+    @staticmethod
+    def _subtract(counts, totals, by_month, key):
+        totals.subtract(counts)
+        for name in counts:
+            if totals[name] <= 0:
+                del totals[name]
+            months = by_month[name]
+            del months[key]
+            if not months:
+                del by_month[name]
+
+    @staticmethod
+    def _subtract_season(counts, by_season, year):
+        totals = by_season[year]
+        totals.subtract(counts)
+        for name in counts:
+            if totals[name] <= 0:
+                del totals[name]
+        if not totals:
+            del by_season[year]
+
+    @staticmethod
+    def season(first, last):
+
+        """
+        Returns the year when the season started if
+        the range of months is a season, otherwise None.
+
+        """
+        if first is None or last is None:
+            return None
+        year = season_of(first)
+        return year if season_range(year) == (first, last) else None
+
+    def _count(self, by_month, by_season, name, first, last):
+        year = self.season(first, last)
+        if year is not None:
+            return by_season.get(year, Counter())[name]
+        months = by_month.get(name, {})
+        first, last = first or '', last or '999999'
+        return sum(count for key, count in months.items() if first <= key <= last)
+
+    def person_count(self, name, first=None, last=None):
+
+        """
+        Returns a number of events attended by the person.
+        first and last are optional keys (YYYYMM) of a range of months.
+
+        """
+        name = name.strip()
+        if first is None and last is None:
+            return self.people[name]
+        return self._count(self.people_months, self.people_seasons, name, first, last)
+
+    def title_count(self, title, first=None, last=None):
+
+        """
+        Returns a number of performances of the title.
+        first and last are optional keys (YYYYMM) of a range of months.
+
+        """
+        if first is None and last is None:
+            return self.titles[title]
+        return self._count(self.titles_months, self.titles_seasons, title, first, last)
+
+    def month_count(self, key):
+
+        """
+        Returns a number of events in the month.
+
+        """
+        if key not in self.months:
+            return 0
+        return self.months[key][2]
+
+    def _ranking(self, index, first, last):
+        if first is None and last is None:
+            totals = self.people if index == 0 else self.titles
+            return totals.most_common()
+        year = self.season(first, last)
+        if year is not None:
+            by_season = self.people_seasons if index == 0 else self.titles_seasons
+            return by_season.get(year, Counter()).most_common()
+        result = Counter()
+        for key, month in self.months.items():
+            if (first or '') <= key <= (last or '999999'):
+                result.update(month[index])
+        return result.most_common()
+
+    def people_ranking(self, first=None, last=None):
+
+        """
+        Returns a list of (name, count) pairs in descending order of counts.
+
+        """
+        return self._ranking(0, first, last)
+
+    def titles_ranking(self, first=None, last=None):
+
+        """
+        Returns a list of (title, count) pairs in descending order of counts.
+
+        """
+        return self._ranking(1, first, last)
+
+    def seasons(self):
+
+        """
+        Returns a sorted list of years when
+        the counted seasons started.
+
+        """
+        return sorted(self.season_months)
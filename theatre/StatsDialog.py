@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5 import QtCore, QtWidgets, QtGui
+
+from theatre.Statistics import season_range
+
+class CountTable(QtWidgets.QTableView):
+
+    """
+    A table of names and counts.
+
+    """
+    def __init__(self, header, parent=None):
+        QtWidgets.QTableView.__init__(self, parent)
+        self.header = header
+        self.counts = QtGui.QStandardItemModel(self)
+        self.setModel(self.counts)
+        self.verticalHeader().hide()
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+
+    def set_counts(self, ranking):
+
+        """
+        Fills the table with (name, count) pairs.
+
+        """
+        self.counts.clear()
+        self.counts.setHorizontalHeaderLabels([self.header, 'Count'])
+        for name, count in ranking:
+            count_item = QtGui.QStandardItem(str(count))
+            count_item.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
+            self.counts.appendRow((QtGui.QStandardItem(name), count_item))
+        self.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+
+
+
+class StatsDialog(QtWidgets.QDialog):
+
+    """
+    Shows counts of events per person and per title.
+
+    """
+    def __init__(self, shedule, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+
+        self.setWindowTitle('Statistics')
+        self.setMinimumSize(500, 400)
+        self.statistics = shedule.statistics
+
+        # create a widget for season and fill it
+        # with seasons that have events
+        self.seasonEdit = QtWidgets.QComboBox()
+        self.seasonEdit.addItem('All time', None)
+        for year in reversed(self.statistics.seasons()):
+            self.seasonEdit.addItem('{}/{}'.format(year, year + 1), year)
+        self.seasonEdit.currentIndexChanged.connect(self.on_season_changed)
+
+        # create tables
+        self.peopleTable = CountTable('Who')
+        self.titlesTable = CountTable('Title')
+        tabs = QtWidgets.QTabWidget()
+        tabs.addTab(self.peopleTable, 'People')
+        tabs.addTab(self.titlesTable, 'Titles')
+
+        # attach widgets to layout
+        form = QtWidgets.QFormLayout()
+        form.addRow('Season', self.seasonEdit)
+
+        # create control buttons
+        self.closeBtn = QtWidgets.QPushButton('Close')
+        self.closeBtn.clicked.connect(self.reject)
+
+        # add buttons to layout
+        btnBox = QtWidgets.QHBoxLayout()
+        btnBox.addStretch()
+        btnBox.addWidget(self.closeBtn)
+
+        # add layouts to main layout
+        mainBox = QtWidgets.QVBoxLayout()
+        mainBox.addLayout(form)
+        mainBox.addWidget(tabs)
+        mainBox.addLayout(btnBox)
+
+        # set layout to the window
+        self.setLayout(mainBox)
+        self.on_season_changed()
+
+    @QtCore.pyqtSlot()
+    def on_season_changed(self):
+
+        """
+        Called when another season has been selected.
+
+        """
+        year = self.seasonEdit.currentData()
+        first, last = (None, None) if year is None else season_range(year)
+        self.peopleTable.set_counts(self.statistics.people_ranking(first, last))
+        self.titlesTable.set_counts(self.statistics.titles_ranking(first, last))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+from io import BytesIO
+import hashlib
+import pickle
+import shelve
+
+# events and the storage do not depend on Qt,
+# so command line tools can use them without it
+
+class Event:
+
+    """
+    A theatre event (performance, concert).
+
+    """
+    def __init__(self, date, title, people=None, hashsum=None):
+        self.date = date
+        self.title = title
+        self.people = people
+        self.hash = hashsum
+
+
+
+class EventUnpickler(pickle.Unpickler):
+
+    """
+    Loads stored events. Databases written before events
+    have been moved to this module refer to the Event class
+    of theatre.TheatreModel, which imports Qt.
+
+    """
+    def find_class(self, module, name):
+        if (module, name) == ('theatre.TheatreModel', 'Event'):
+            return Event
+        return pickle.Unpickler.find_class(self, module, name)
+
+
+
+def digest(events):
+
+    """
+    Returns a hex digest of content of events.
+    It does not depend on order of events.
+
+    """
+    m = hashlib.md5()
+    for event in sorted(events, key=lambda event: (event.date, event.title or '', event.people or '')):
+        line = '{}\t{}\t{}\n'.format(event.date.strftime('%Y.%m.%d %H:%M'), event.title or '', event.people or '')
+        m.update(line.encode())
+    return m.hexdigest()
+
+
+
+def merge_events(events, event_list, now=None, remove=True):
+
+    """
+    Merges raw data from the theatre website into events of a month.
+    Events in the past are not touched. A new event is added,
+    a changed one is replaced keeping its people, a synced event
+    missing on the website is removed unless remove is False.
+    Manually added events (their hashsum is None) are kept.
+
+    Returns a list of merged events and a list of change reports.
+
+    """
+    if now is None:
+        now = datetime.now()
+    merged = list(events)
+    by_date = {event.date: number for number, event in enumerate(merged)}
+    changes = []
+    # check for new events in the update
+    for new_event in event_list:
+        # skip events in the past
+        if new_event.date < now:
+            continue
+        number = by_date.get(new_event.date)
+        if number is None: # the event is new
+            by_date[new_event.date] = len(merged)
+            merged.append(new_event)
+            changes.append('Added:   {} {}'.format(new_event.date.strftime('%d %a %H:%M'), new_event.title))
+        elif merged[number].hash != new_event.hash: # the event has beed changed
+            event = merged[number]
+            merged[number] = Event(new_event.date, new_event.title, event.people, new_event.hash)
+            changes.append('Changed: {} {}\n{:>21}'.format(event.date.strftime('%d %a %H:%M'), event.title, new_event.title))
+
+    # search removed events
+    hashes = {new_event.hash for new_event in event_list}
+    kept = []
+    for event in merged:
+        # keep events in the past, added manually (hashsum is None)
+        # or existing in update data
+        if not remove or event.date < now or event.hash is None or event.hash in hashes:
+            kept.append(event)
+        else:
+            changes.append('Removed: {} {}'.format(event.date.strftime('%d %a %H:%M'), event.title))
+
+    return kept, changes
+
+
+
+class Storage:
+
+    """
+    Reads and writes data using shelve module.
+    Use flag 'r' to open the storage read-only.
+    Events are read by EventUnpickler.
+
+    """
+    def __init__(self, filename, flag='c'):
+        self.db = shelve.open(filename, flag)
+        # objects notified about changes of months,
+        # each of them has update_month(key, events) method
+        self.observers = []
+
+    def read(self, key):
+        data = self.db.dict[key.encode(self.db.keyencoding)]
+        return EventUnpickler(BytesIO(data)).load()
+
+    def write(self, key, data):
+        self.db[key] = data
+        self.notify(key, data)
+
+    def notify(self, key, events):
+
+        """
+        Passes new events of the month to all observers.
+
+        """
+        for observer in self.observers:
+            observer.update_month(key, events)
+
+    def months(self):
+
+        """
+        Returns sorted keys (YYYYMM) of all stored months.
+
+        """
+        return sorted(key for key in self.db.keys() if len(key) == 6 and key.isdigit())
+
+    def iter_months(self, first=None, last=None):
+
+        """
+        Yields (key, events) pairs of stored months in order.
+        first and last are optional keys (YYYYMM) of a range of months.
+
+        """
+        for key in self.months():
+            if first is not None and key < first:
+                continue
+            if last is not None and key > last:
+                break
+            yield key, self.read(key)
+
+    def sync(self):
+
+        """
+        Writes all cached changes to the disk.
+
+        """
+        self.db.sync()
+
+    def close(self):
+        self.db.close()
+
+def merge_into_storage(storage, events, now=None, remove=True):
+
+    """
+    Merges downloaded events (a dictionary YYYYMM -> a list
+    of events) into stored months and writes changed months.
+    Returns a dictionary YYYYMM -> a list of change reports.
+    See merge_events.
+
+    """
+    report = {}
+    for key, update in sorted(events.items()):
+        try:
+            existing = storage.read(key)
+        except KeyError: # the month is new
+            existing = []
+        merged, changes = merge_events(existing, update, now, remove)
+        if changes:
+            storage.write(key, sorted(merged, key=lambda event: event.date))
+            report[key] = changes
+    storage.sync()
+    return report
@@ -1,15 +1,60 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import sys, os, platform
+import sys, os, platform, time
+
+# the time when the program started, Qt has not been loaded yet
+STARTED = time.perf_counter()
+
 from PyQt5 import QtWidgets, QtCore, QtGui
 
 from theatre.TrayIcon import TrayIcon
 from theatre.TheatreModel import Shedule
-from theatre.Preferences import Preferences, is_windows
-from theatre.MainWindow import CURRENT_PATH
+from theatre.Preferences import Preferences, is_windows, DB_FILENAME
+from theatre.Resources import CURRENT_PATH
+
+# the startup report is written to stderr when this option is given
+# or the environment variable is set
+REPORT_OPTION = '--startup-report'
+REPORT_VARIABLE = 'THEATRE_STARTUP_REPORT'
+
+class StartupTimer:
+
+    """
+    Measures phases of startup.
+
+    """
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.marks = [('imports', time.perf_counter())]
+
+    def mark(self, phase):
+
+        """
+        Remembers when the phase has been completed.
+
+        """
+        if self.enabled:
+            self.marks.append((phase, time.perf_counter()))
+
+    def report(self, stream=sys.stderr):
+
+        """
+        Writes durations of phases and loaded modules of the program.
+
+        """
+        if not self.enabled:
+            return
+        prev = STARTED
+        for phase, moment in self.marks:
+            print('{:<12} {:8.1f} ms'.format(phase, (moment - prev) * 1000), file=stream)
+            prev = moment
+        print('{:<12} {:8.1f} ms'.format('total', (prev - STARTED) * 1000), file=stream)
+        modules = sorted(name for name in sys.modules if name.startswith('theatre.'))
+        print('loaded modules: ' + ', '.join(modules), file=stream)
+
+
 
-DB_FILENAME = "shedule.db" # filename for database
 
 class TheatreApplication(QtWidgets.QApplication):
 
@@ -17,15 +62,21 @@ class TheatreApplication(QtWidgets.QApplication):
     Creates all application components.
 
     """
-    def __init__(self, *args):
-        QtWidgets.QApplication.__init__(self, *args)
+    def __init__(self, argv, timer=None):
+        self.timer = timer or StartupTimer(False)
+        QtWidgets.QApplication.__init__(self, argv)
+        self.timer.mark('application')
         self.setQuitOnLastWindowClosed(False) # it should work in the system tray
         self.aboutToQuit.connect(self.on_quit)
         self.setIconTheme()
         prefs = Preferences() # application preferences
         self.shedule = Shedule(prefs.at_home(DB_FILENAME)) # create a database object
+        self.timer.mark('database')
         self.trayicon = TrayIcon(self.shedule) # create tray icon
         self.trayicon.show()
+        self.timer.mark('tray icon')
+        # the first iteration of the event loop ends the startup
+        QtCore.QTimer.singleShot(0, self.on_started)
 
     @staticmethod
     def setIconTheme():
@@ -39,6 +90,16 @@ class TheatreApplication(QtWidgets.QApplication):
             QtGui.QIcon.setThemeSearchPaths([path])
             QtGui.QIcon.setThemeName('black_white_2_gloss')
 
+    @QtCore.pyqtSlot()
+    def on_started(self):
+
+        """
+        Called when the event loop has been started.
+
+        """
+        self.timer.mark('event loop')
+        self.timer.report()
+
     @QtCore.pyqtSlot()
     def on_quit(self):
 
@@ -54,5 +115,10 @@ def start():
     The main entry point of the program.
 
     """
-    app = TheatreApplication(sys.argv)
+    argv = list(sys.argv)
+    enabled = bool(os.environ.get(REPORT_VARIABLE))
+    if REPORT_OPTION in argv:
+        argv.remove(REPORT_OPTION)
+        enabled = True
+    app = TheatreApplication(argv, StartupTimer(enabled))
     sys.exit(app.exec_())
@@ -3,60 +3,160 @@
 
 from PyQt5 import QtCore, QtGui
 from datetime import datetime
-import shelve
+from bisect import bisect_left
+from collections import Counter
 
-class Storage:
+# a role of date items containing a filter flag:
+# '1' if the event is accepted by the filter, '0' otherwise
+FILTER_ROLE = QtCore.Qt.UserRole + 2
+
+# events and the storage are defined without Qt, modules of
+# the application import them from here
+from theatre.Store import Event, Storage, digest, merge_events
+from theatre.Search import SearchIndex, normalize
+from theatre.Statistics import Aggregates
+
+def event_row(event):
 
     """
-    Reads and writes data using shelve module.
+    Returns a row for QStandardItemModel
+    using elements of the event.
 
     """
-    def __init__(self, filename):
-        self.db = shelve.open(filename)
+    date_item = QtGui.QStandardItem(event.date.strftime('%d %a'))
+    date_item.setData(event.date) # date field contains a datetime object of the event
+    date_item.setData('1', FILTER_ROLE) # new events are shown until the filter is applied
+    time_item = QtGui.QStandardItem(event.date.strftime('%H:%M'))
+    time_item.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
+    title_item = QtGui.QStandardItem(event.title)
+    title_item.setData(event.hash) # title field contains a hashsum of the event
+    people_item = QtGui.QStandardItem(event.people)
+    people_item.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
+    row = (date_item, time_item, title_item, people_item)
+    # forbid editting of all fields
+    for item in row:
+        item.setEditable(False)
+    return row
 
-    def read(self, key):
-        return self.db[key]
 
-    def write(self, key, data):
-        self.db[key] = data
 
-    def close(self):
-        self.db.close()
+def first_at(events, date):
+
+    """
+    Returns a position of the first event at the date or later
+    in the list of events sorted by dates.
+
+    """
+    low, high = 0, len(events)
+    while low < high:
+        middle = (low + high) // 2
+        if events[middle].date < date:
+            low = middle + 1
+        else:
+            high = middle
+    return low
 
 
 
-class Event:
+def event_key(event):
 
     """
-    A theatre event (performance, concert).
+    Returns a key of the event that stays the same while
+    the event is not changed on the website: its hashsum
+    or its date if the event has been added manually.
 
     """
-    def __init__(self, date, title, people=None, hashsum=None):
-        self.date = date
-        self.title = title
-        self.people = people
-        self.hash = hashsum
+    return event.hash if event.hash is not None else event.date
+
 
-    def row(self):
+
+class ColumnIndex:
+
+    """
+    Plain columns of events of a month in order of source rows.
+    Used for filtering without calls to the model.
+
+    """
+    def __init__(self, events):
+        self.dates = []
+        self.titles = [] # normalized titles
+        self.people = [] # normalized people
+        self.weekdays = []
+        self.minutes = [] # minutes since midnight
+        for event in events:
+            self.dates.append(event.date)
+            self.titles.append(normalize(event.title or ''))
+            self.people.append(normalize(event.people or ''))
+            self.weekdays.append(event.date.weekday())
+            self.minutes.append(event.date.hour * 60 + event.date.minute)
+        # rows in order of dates and their sorted dates for bisection
+        self.order = sorted(range(len(self.dates)), key=lambda row: self.dates[row])
+        self.sorted_dates = [self.dates[row] for row in self.order]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def following(self, date):
 
         """
-        Returns a row for QStandardItemModel
-        using Event elements.
+        Returns rows of events at the date or later in order of dates.
 
         """
-        date_item = QtGui.QStandardItem(self.date.strftime('%d %a'))
-        date_item.setData(self.date) # date field contains a datetime object of the event
-        time_item = QtGui.QStandardItem(self.date.strftime('%H:%M'))
-        time_item.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-        title_item = QtGui.QStandardItem(self.title)
-        title_item.setData(self.hash) # title field contains a hashsum of the event
-        people_item = QtGui.QStandardItem(self.people)
-        people_item.setTextAlignment(QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter)
-        row = (date_item, time_item, title_item, people_item)
-        # forbid editting of all fields
-        for item in row:
-            item.setEditable(False)
-        return row
+        return self.order[bisect_left(self.sorted_dates, date):]
+
+
+
+class EventFilter:
+
+    """
+    Conditions of events shown in the table.
+    Empty conditions accept all events.
+
+    """
+    def __init__(self, title='', people='', weekday=None, start=None, end=None):
+        self.title = normalize(title.strip()) # a substring of the title
+        self.people = normalize(people.strip()) # a substring of people
+        self.weekday = weekday # 0 is Monday
+        # a range of time in minutes since midnight
+        self.start = start
+        self.end = end
+
+    def is_empty(self):
+
+        """
+        Returns True if the filter accepts all events.
+
+        """
+        return not (self.title or self.people) and self.weekday is None \
+                and self.start is None and self.end is None
+
+    def key(self):
+
+        """
+        Returns a hashable description of the conditions.
+
+        """
+        return (self.title, self.people, self.weekday, self.start, self.end)
+
+    def rows(self, columns):
+
+        """
+        Returns a set of rows accepted by the filter.
+
+        """
+        rows = range(len(columns))
+        if self.weekday is not None:
+            rows = [row for row in rows if columns.weekdays[row] == self.weekday]
+        if self.start is not None:
+            rows = [row for row in rows if columns.minutes[row] >= self.start]
+        if self.end is not None:
+            rows = [row for row in rows if columns.minutes[row] <= self.end]
+        if self.title:
+            rows = [row for row in rows if self.title in columns.titles[row]]
+        if self.people:
+            rows = [row for row in rows if self.people in columns.people[row]]
+        return set(rows)
+
 
 
 class SortProxyModel(QtCore.QSortFilterProxyModel):
@@ -70,8 +170,14 @@ class SortProxyModel(QtCore.QSortFilterProxyModel):
         QtCore.QSortFilterProxyModel.__init__(self, parent)
 
         self.setSortRole(QtCore.Qt.UserRole + 1) # sort by datetime object
+        # filter by flags in date items, the flags are set by set_filter
+        self.setFilterKeyColumn(0)
+        self.setFilterRole(FILTER_ROLE)
+        self.event_filter = None
         self.setSourceModel(model)
         self.sort(0)
+        # new rows have no correct flags, so re-apply the filter later
+        model.rowsInserted.connect(self.on_rows_inserted, QtCore.Qt.QueuedConnection)
 
     def lessThan(self, leftIndex, rightIndex):
 
@@ -84,6 +190,7 @@ class SortProxyModel(QtCore.QSortFilterProxyModel):
         return model.data(leftIndex, QtCore.Qt.UserRole + 1) < model.data(rightIndex, QtCore.Qt.UserRole + 1)
 
     def __iter__(self):
+        self.sourceModel().fetch_all() # iterate over all events
         self._index = 0
         return self
 
@@ -110,6 +217,56 @@ class SortProxyModel(QtCore.QSortFilterProxyModel):
         """
         return getattr(self.sourceModel(), name)
 
+    def set_filter(self, event_filter):
+
+        """
+        Shows only events accepted by the filter.
+        Filter flags of all rows are changed silently
+        and applied by the proxy as a single change.
+
+        """
+        self.event_filter = event_filter
+        if event_filter is None or event_filter.is_empty():
+            self.setFilterFixedString('') # accept all rows
+            return
+        model = self.sourceModel()
+        model.fetch_all() # the filter is applied to all events
+        rows = event_filter.rows(model.columns())
+        model.blockSignals(True)
+        for row in range(model.rowCount()):
+            model.item(row, 0).setData('1' if row in rows else '0', FILTER_ROLE)
+        model.blockSignals(False)
+        if self.filterRegExp().pattern() == '1':
+            self.invalidateFilter()
+        else:
+            self.setFilterFixedString('1')
+
+    def nearest_row(self, date):
+
+        """
+        Returns a row of the first shown event at the date
+        or later. Returns None if there is no such event.
+
+        """
+        model = self.sourceModel()
+        # the filter adds all events to the model, otherwise
+        # only events up to the date are added
+        for source_row in model.following(date):
+            index = self.mapFromSource(model.index(source_row, 0))
+            if index.isValid(): # the event is not filtered out
+                return index.row()
+        return None
+
+    @QtCore.pyqtSlot('QModelIndex', int, int)
+    def on_rows_inserted(self, parent, first, last):
+
+        """
+        Called when rows have been added to the source model.
+
+        """
+        if self.event_filter is not None:
+            self.set_filter(self.event_filter)
+
     def add(self, event):
 
         """
@@ -117,9 +274,10 @@ class SortProxyModel(QtCore.QSortFilterProxyModel):
         Re-sorts events.
 
         """
-        self.appendRow(event.row())
+        self.appendRow(event_row(event))
         self.sourceModel().changed = True
         self.sort(0)
+        self.sourceModel().notify()
 
     def delete(self, row):
 
@@ -129,6 +287,7 @@ class SortProxyModel(QtCore.QSortFilterProxyModel):
         """
         self.removeRow(row)
         self.sourceModel().changed = True
+        self.sourceModel().notify()
 
     def replace(self, row, event):
 
@@ -138,8 +297,12 @@ class SortProxyModel(QtCore.QSortFilterProxyModel):
         Re-sorts events.
 
         """
-        self.delete(row)
-        self.add(event)
+        self.removeRow(row)
+        self.appendRow(event_row(event))
+        self.sourceModel().changed = True
+        self.sort(0)
+        # observers are notified once for both changes
+        self.sourceModel().notify()
 
 
 
@@ -149,7 +312,12 @@ class Month(QtGui.QStandardItemModel):
     A model used by QTableView. Contains a collection of events.
     Is iterable.
 
+    Loaded events are added to the model by chunks
+    when a view asks for more rows (see fetchMore).
+
     """
+    fetch_chunk = 50 # a number of rows added at once
+
     def __init__(self, date, storage):
         QtGui.QStandardItemModel.__init__(self)
         self.storage = storage
@@ -157,14 +325,23 @@ class Month(QtGui.QStandardItemModel):
         self.key = date.strftime('%Y%m')
         self.date = datetime(date.year, date.month, 1)
         self.changed = False
+        self.pending = [] # loaded events that have not been added yet
+        self._columns = None # an index of columns is built on demand
+        self._days = None # as well as a summary of days
+        self._fingerprint = None # and a digest of events
         # signal will be emitted when the model is changed manually 
         self.dataChanged.connect(self.on_changed)
+        # drop the index of columns and the summary when rows are changed
+        self.rowsInserted.connect(self.on_rows_changed)
+        self.rowsRemoved.connect(self.on_rows_changed)
+        self.modelReset.connect(self.on_reset)
         try:
             self.load() # try load data
         except:
             pass
 
     def __iter__(self):
+        self.fetch_all() # iterate over all events
         self._index = 0
         return self
 
@@ -177,24 +354,106 @@ class Month(QtGui.QStandardItemModel):
         """
         if self._index >= self.rowCount():
             raise StopIteration
-        date = self.data(self.index(self._index, 0), QtCore.Qt.UserRole + 1)
-        title = self.data(self.index(self._index, 2))
-        hashsum = self.data(self.index(self._index, 2), QtCore.Qt.UserRole + 1)
-        people = self.data(self.index(self._index, 3))
         self._index += 1
+        return self.row_event(self._index - 1)
+
+    def row_event(self, row):
+
+        """
+        Returns an Event object of the row.
+
+        """
+        date = self.data(self.index(row, 0), QtCore.Qt.UserRole + 1)
+        title = self.data(self.index(row, 2))
+        hashsum = self.data(self.index(row, 2), QtCore.Qt.UserRole + 1)
+        people = self.data(self.index(row, 3))
         return Event(date, title, people, hashsum)
 
+    def events(self):
+
+        """
+        Returns a list of all events of the month
+        without adding pending events to the model.
+
+        """
+        return [self.row_event(row) for row in range(self.rowCount())] + self.pending
+
     def load(self):
 
         """
         Loads model data from the storage.
 
         """
-        events = self.storage.read(self.key)
-        for event in events:
-            self.appendRow(event.row())
+        try:
+            events = self.storage.read(self.key)
+        except KeyError: # the month has not been saved yet
+            events = []
+        # add events in order of dates, so the first chunk
+        # contains the beginning of the month
+        self.pending = sorted(events, key=lambda event: event.date)
+        self.fetchMore(QtCore.QModelIndex())
+        if self.changed:
+            # observers may have got unsaved events of the month
+            self.storage.notify(self.key, events)
         self.changed = False
 
+    def canFetchMore(self, parent):
+
+        """
+        Returns True if there are loaded events
+        that have not been added yet.
+
+        """
+        return not parent.isValid() and bool(self.pending)
+
+    def fetchMore(self, parent):
+
+        """
+        Adds the next chunk of loaded events.
+
+        """
+        if parent.isValid():
+            return
+        chunk = self.pending[:self.fetch_chunk]
+        del self.pending[:self.fetch_chunk]
+        for event in chunk:
+            self.appendRow(event_row(event))
+
+    def fetch_all(self):
+
+        """
+        Adds all loaded events to the model.
+
+        """
+        while self.pending:
+            self.fetchMore(QtCore.QModelIndex())
+
+    def fetch_until(self, date):
+
+        """
+        Adds chunks of loaded events until the first pending
+        event at the date or later is added.
+
+        """
+        count = first_at(self.pending, date) + 1
+        while count > 0 and self.pending:
+            count -= self.fetch_chunk
+            self.fetchMore(QtCore.QModelIndex())
+
+    def following(self, date):
+
+        """
+        Returns rows of events at the date or later in order of dates.
+        Pending events after the first such one stay pending.
+
+        """
+        # the first pending event at the date is found by bisection
+        # and added, later pending events follow it in any case,
+        # so bisection of added rows gives the whole answer
+        if self.pending:
+            self.fetch_until(date)
+        return self.columns().following(date)
+
     def save(self):
 
         """
@@ -216,8 +475,19 @@ class Month(QtGui.QStandardItemModel):
 
         """
         QtGui.QStandardItemModel.clear(self)
+        self.pending = []
         self.setHorizontalHeaderLabels(['Date', 'Time', 'Title', 'Who'])
         self.changed = True
+        self.notify()
+
+    def notify(self):
+
+        """
+        Passes current events of the month to observers
+        of the storage, so unsaved changes are searchable.
+
+        """
+        self.storage.notify(self.key, self.events())
 
     @QtCore.pyqtSlot('QModelIndex', 'QModelIndex')
     def on_changed(self, topLeft, bottomRight):
@@ -228,6 +498,75 @@ class Month(QtGui.QStandardItemModel):
 
         """
         self.changed = True
+        self.invalidate()
+
+    @QtCore.pyqtSlot('QModelIndex', int, int)
+    def on_rows_changed(self, parent, first, last):
+
+        """
+        Called when rows have been inserted or removed.
+
+        """
+        self.invalidate()
+
+    @QtCore.pyqtSlot()
+    def on_reset(self):
+
+        """
+        Called when the model has been cleared.
+
+        """
+        self.invalidate()
+
+    def invalidate(self):
+
+        """
+        Drops data computed from events of the model.
+
+        """
+        self._columns = None
+        self._days = None
+        self._fingerprint = None
+
+    def fingerprint(self):
+
+        """
+        Returns a digest of events of the month.
+
+        """
+        if self._fingerprint is None:
+            self._fingerprint = digest(self)
+        return self._fingerprint
+
+    def days(self):
+
+        """
+        Returns a summary of days of the month: a dictionary
+        day -> (a number of events, the first event).
+
+        """
+        if self._days is None:
+            self._days = {}
+            # pending events are counted without adding them to the model
+            for event in sorted(self.events(), key=lambda event: event.date):
+                day = event.date.day
+                if day in self._days:
+                    count, first = self._days[day]
+                    self._days[day] = (count + 1, first)
+                else:
+                    self._days[day] = (1, event)
+        return self._days
+
+    def columns(self):
+
+        """
+        Returns an index of columns of rows added to the model,
+        pending events are not added by it.
+
+        """
+        if self._columns is None:
+            self._columns = ColumnIndex(self.row_event(row) for row in range(self.rowCount()))
+        return self._columns
 
     def search_event(self, search_event):
 
@@ -246,40 +585,39 @@ class Month(QtGui.QStandardItemModel):
         Updates the model using raw data from the thetre website.
 
         """
-        changes = []
-        # check for new events in the update
-        for new_event in event_list:
-            # skip events in the past
-            if new_event.date < datetime.now():
-                continue
-            event, row = self.search_event(new_event)
-            if event is None: # the event is new
-                self.appendRow(new_event.row())
-                changes.append('Added:   {} {}'.format(new_event.date.strftime('%d %a %H:%M'), new_event.title))
-            elif event.hash != new_event.hash: # the event has beed changed
-                self.removeRow(row)
-                new_event.people = event.people
-                self.appendRow(new_event.row())
-                changes.append('Changed: {} {}\n{:>21}'.format(event.date.strftime('%d %a %H:%M'), event.title, new_event.title))
-
-        # search removed events
-        for event in self:
-            # skip events in the past
-            if event.date < datetime.now():
-                continue
-            for new_event in event_list:
-                # break if the event has been added manually (hashsum is None)
-                # or it exists in update data
-                if event.hash is None or event.hash == new_event.hash:
-                    break
-            else: # nothing matched, break has not been executed
-                # remove event, self._index has been incremented
-                # by 'next' method before it returned an Event
-                self.removeRow(self._index - 1)
-                changes.append('Removed: {} {}'.format(event.date.strftime('%d %a %H:%M'), event.title))
-
+        existing = list(self) # events in order of rows
+        merged, changes = merge_events(existing, event_list)
         if changes:
+            # only rows of removed and replaced events are edited,
+            # so views keep their state. Rows are matched by keys
+            # of events, see event_key
+            kept = Counter(event_key(event) for event in merged)
+            removed = []
+            for row, event in enumerate(existing):
+                key = event_key(event)
+                if kept[key] > 0:
+                    kept[key] -= 1
+                else:
+                    removed.append(row)
+            # remove adjacent rows at once, from the end
+            # so numbers of other removed rows do not change
+            while removed:
+                last = removed.pop()
+                first = last
+                while removed and removed[-1] == first - 1:
+                    first = removed.pop()
+                self.removeRows(first, last - first + 1)
+            present = Counter(event_key(event) for event in existing)
+            for event in merged:
+                key = event_key(event)
+                if present[key] > 0:
+                    present[key] -= 1
+                else:
+                    self.appendRow(event_row(event))
             self.changed = True
+            # let observers know about merged events,
+            # load passes them saved events if the changes are dropped
+            self.notify()
 
         return changes
 
@@ -295,10 +633,86 @@ class Shedule:
         self.current_month = datetime.today().month
         self.storage = Storage(filename)
         self.cache = {} # a cache to store loaded months
+        self._search_index = None # the index is built on first search
+        self._statistics = None # aggregates are counted on first request
 
     def close(self):
         self.storage.close()
 
+    def observe(self, observer):
+
+        """
+        Feeds all months to the observer and subscribes it
+        to further changes. Unsaved changes of months
+        in the cache are taken into account.
+
+        """
+        changed = [key for key, month in self.cache.items() if month.changed]
+        for key in sorted(set(self.storage.months()).union(changed)):
+            observer.update_month(key, self.read_events(key))
+        self.storage.observers.append(observer)
+
+    @property
+    def search_index(self):
+
+        """
+        The full-text index over all months.
+
+        """
+        if self._search_index is None:
+            self._search_index = SearchIndex()
+            self.observe(self._search_index)
+        return self._search_index
+
+    def search(self, query, fields=None):
+
+        """
+        Returns events of all months matching the query
+        sorted by date. See SearchIndex.search.
+
+        """
+        return self.search_index.search(query, fields)
+
+    @property
+    def statistics(self):
+
+        """
+        Counts of events per person, title and month.
+
+        """
+        if self._statistics is None:
+            self._statistics = Aggregates()
+            self.observe(self._statistics)
+        return self._statistics
+
+    def read_events(self, key):
+
+        """
+        Returns events of the month sorted by date without
+        creating a model. Unsaved changes are taken into account.
+
+        """
+        if key in self.cache and self.cache[key].changed:
+            # pending events are not added to the model
+            events = self.cache[key].sourceModel().events()
+        else:
+            try:
+                events = self.storage.read(key)
+            except KeyError: # there is no such month
+                events = []
+        return sorted(events, key=lambda event: event.date)
+
+    def month_size(self, key):
+
+        """
+        Returns a number of events in the month.
+
+        """
+        if key in self.cache and self.cache[key].changed:
+            month = self.cache[key].sourceModel()
+            return month.rowCount() + len(month.pending)
+        return self.statistics.month_count(key)
+
     def get_month(self, date=None, key=None):
 
         """
@@ -314,13 +728,24 @@ class Shedule:
             self.cache[key] = SortProxyModel(Month(date, self.storage))
         return self.cache[key] # get from the cache
 
+    def jump_to(self, date):
+
+        """
+        Makes the month of the date current
+        and returns its model.
+
+        """
+        self.current_year = date.year
+        self.current_month = date.month
+        return self.get_month(date)
+
     def get_actual(self):
 
         """
         Returns a model of the current month
 
         """
-        return self.get_month(datetime.now())
+        return self.jump_to(datetime.now())
 
     def get_next(self):
 
@@ -336,7 +761,7 @@ class Shedule:
             self.current_month = 1
             # of the next year
             self.current_year += 1
-        return self.get_month(datetime(self.current_year, self.current_month, 1))
+        return self.jump_to(datetime(self.current_year, self.current_month, 1))
 
     def get_previous(self):
 
@@ -352,7 +777,7 @@ class Shedule:
             self.current_month = 12
             # of the previous year
             self.current_year -= 1
-        return self.get_month(datetime(self.current_year, self.current_month, 1))
+        return self.jump_to(datetime(self.current_year, self.current_month, 1))
 
     def is_changed(self):
 
@@ -6,11 +6,13 @@ from PyQt5 import QtWidgets, QtCore, QtGui
 from datetime import datetime
 import calendar
 
-from theatre.MainWindow import MainWindow, ICON_DEFAULT, ICON_NEW
-from theatre.TheatreModel import Event
-from theatre.Sync import SyncThread
+from theatre.Resources import ICON_DEFAULT, ICON_NEW
 from theatre.Preferences import Preferences
-from theatre.PrefDialog import PrefDialog
+from theatre.Scheduler import SyncScheduler
+
+# the main window, the preferences dialog and synchronization
+# are imported when they are used first time, so the icon
+# appears in the tray as soon as possible
 
 class TrayMenu(QtWidgets.QMenu):
 
@@ -26,6 +28,8 @@ class TrayMenu(QtWidgets.QMenu):
         self.show_action.setChecked(False) # the main window is hidden by default
         self.addSeparator()
         self.sync_action = self.addAction(QtGui.QIcon.fromTheme('reload'), "Sync all") # sync shedule
+        self.cancel_action = self.addAction(QtGui.QIcon.fromTheme('stop'), "Cancel sync") # stop running sync
+        self.cancel_action.setEnabled(False) # there is nothing to cancel yet
         self.settings_action = self.addAction(QtGui.QIcon.fromTheme('gtk-preferences'), "Preferences") # show settings window
         self.addSeparator()
         self.quit_action = self.addAction(QtGui.QIcon.fromTheme('exit'), "Quit") # quit program
@@ -59,18 +63,25 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
         self.menu = TrayMenu()
         self.menu.show_action.triggered.connect(self.on_show_theatre)
         self.menu.sync_action.triggered.connect(self.on_sync)
+        self.menu.cancel_action.triggered.connect(self.on_cancel_sync)
         self.menu.settings_action.triggered.connect(self.on_settings)
         self.menu.quit_action.triggered.connect(self.on_quit)
 
         self.main_window = None # do not create MainWindow at startup
         self.thread = None # syncronization thread
+        self.stale_threads = [] # hung threads are kept until they stop
+        self.failed_sync = None # the failed sync is continued by the next one
         self.manual_sync = False # is synchronization called by user
         self.has_new = False # are there updates
         self.setToolTip(self.tooltip_text)
 
-        prefs = Preferences()
-        # start the timer for automatic sync
-        self.timer_id = self.startTimer(prefs['SYNC']['sync_interval'] * 1000)
+        # the timer for automatic sync is started again after each sync
+        # with a delay chosen by the scheduler
+        self.scheduler = SyncScheduler.from_preferences()
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.start_sync)
+        self.timer.start(self.scheduler.delay() * 1000)
 
     @QtCore.pyqtSlot('QSystemTrayIcon::ActivationReason')
     def on_activated(self, reason):
@@ -93,10 +104,12 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
         """
         if checked: # the window shold be shown
             if self.main_window == None: # if the windows has not been created yet
+                from theatre.MainWindow import MainWindow
                 self.main_window = MainWindow(self.shedule) # create the window
                 self.main_window.visible_signal.connect(self.menu.on_visibility_changed)
                 self.main_window.pref_signal.connect(self.on_settings)
                 self.main_window.sync_all_signal.connect(self.on_sync)
+                self.main_window.sync_month_signal.connect(self.on_sync_month)
                 self.main_window.quit_signal.connect(self.on_quit)
             self.main_window.show()
             if self.has_new: # if icon indicates that there are updates
@@ -106,24 +119,77 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
         elif self.main_window != None: # if the window has been created
             self.main_window.hide() # hide it
 
-    def start_sync(self, manual=False):
+    def start_sync(self, manual=False, first=None, last=None):
 
         """
-        Starts synchronization thread.
+        Starts synchronization thread. first and last are
+        optional keys (YYYYMM) of a window of synced months.
 
         """
-        # Do nothing if thread already started.
+        # Do nothing if thread already started
+        # unless it hangs after its deadline.
         if self.thread:
-            return
+            if not self.thread.is_stale():
+                return
+            self.drop_thread()
         self.manual_sync = manual # save manual start flag
         self.has_new = False # there are not updates yet
         self.setIcon(QtGui.QIcon(ICON_DEFAULT)) # set default icon
         self.setToolTip(self.tooltip_text)
-        prefs = Preferences()
-        self.thread = SyncThread() # create a sync thread
+        from theatre.Sync import SyncThread
+        archive = None
+        if Preferences()['SYNC']['archive_pages']:
+            # keep downloaded pages for re-parsing
+            from theatre.Archive import PageArchive, ARCHIVE_DIRNAME
+            archive = PageArchive(Preferences().at_home(ARCHIVE_DIRNAME))
+        self.thread = SyncThread(first, last, archive) # create a sync thread
+        if self.failed_sync is not None:
+            # continue from the last downloaded page
+            self.thread.synchronizer.resume(self.failed_sync)
+            self.failed_sync = None
         self.thread.complete.connect(self.on_sync_complete)
         self.thread.failure.connect(self.on_sync_failure)
         self.thread.start()
+        self.menu.cancel_action.setEnabled(True)
+
+    def drop_thread(self):
+
+        """
+        Cancels the hung thread and forgets it.
+        Its results are not used anymore.
+
+        """
+        thread = self.thread
+        self.thread = None
+        self.menu.cancel_action.setEnabled(False)
+        thread.complete.disconnect(self.on_sync_complete)
+        thread.failure.disconnect(self.on_sync_failure)
+        thread.cancel()
+        # the thread object must live until the thread stops
+        self.stale_threads.append(thread)
+        thread.finished.connect(lambda: self.stale_threads.remove(thread))
+
+    def take_thread(self):
+
+        """
+        Returns the finished thread, so a new sync can be started.
+
+        """
+        thread = self.thread
+        self.thread = None
+        self.menu.cancel_action.setEnabled(False)
+        thread.wait() # wait for thread ends
+        return thread
+
+    @QtCore.pyqtSlot(bool)
+    def on_cancel_sync(self, checked=False):
+
+        """
+        Stops running synchronization.
+
+        """
+        if self.thread:
+            self.thread.cancel()
 
     @QtCore.pyqtSlot(bool)
     def on_sync(self, checked=False):
@@ -134,25 +200,36 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
         """
         self.start_sync(True)
 
-    @QtCore.pyqtSlot()
-    def timer_restart(self):
+    @QtCore.pyqtSlot(str)
+    def on_sync_month(self, key):
 
         """
-        Applies new settings of synchronization interval.
+        Starts manual sinchronization of the month.
 
         """
-        prefs = Preferences()
-        self.killTimer(self.timer_id) # stop old timer
-        # and create new one
-        self.timer_id = self.startTimer(prefs['SYNC']['sync_interval'] * 1000)
+        self.start_sync(True, key, key)
 
-    def timerEvent(self, event):
+    def schedule_sync(self, thread, delay):
 
         """
-        Starts automatic synchronization.
+        Starts the timer of automatic sync. Only a full sync
+        changes the schedule, a partial one just keeps it going.
 
         """
-        self.start_sync()
+        if thread.synchronizer.is_full():
+            self.timer.start(delay() * 1000)
+        elif not self.timer.isActive(): # the timer has fired during the sync
+            self.timer.start(self.scheduler.delay() * 1000)
+
+    @QtCore.pyqtSlot()
+    def timer_restart(self):
+
+        """
+        Applies new settings of synchronization interval.
+
+        """
+        self.scheduler = SyncScheduler.from_preferences()
+        self.timer.start(self.scheduler.delay() * 1000)
 
     @QtCore.pyqtSlot(bool)
     def on_settings(self, checked=False):
@@ -161,6 +238,7 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
         Shows the setting window.
 
         """
+        from theatre.PrefDialog import PrefDialog
         dialog = PrefDialog(self.main_window)
         dialog.pref_changed.connect(self.timer_restart)
         dialog.exec_()
@@ -182,6 +260,9 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
             elif answer == QtWidgets.QMessageBox.Cancel: # user pressed Dancel
                 return # do nothing
             # if user pressed Discard - just quit program
+        if self.thread: # do not destroy running thread
+            self.thread.cancel()
+            self.thread.wait()
         QtWidgets.qApp.quit()
 
     def show_message(self, message, icon):
@@ -199,9 +280,8 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
             self.showMessage('Sync report', message)
             self.setIcon(QtGui.QIcon(ICON_NEW))
             self.setToolTip(self.tooltip_text_new)
-        self.thread = None # remove thread object
 
-    @QtCore.pyqtSlot('QDateTime', 'QByteArray')
+    @QtCore.pyqtSlot()
     def on_sync_complete(self):
 
         """
@@ -210,21 +290,24 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
 
         """
         all_changes = {}
-        self.thread.wait() # wait for thread ends
-        for key, month in self.thread.events.items():
+        thread = self.take_thread()
+        for key, month in thread.events.items():
             model = self.shedule.get_month(key=key)
             changes = model.update(month)
             if changes:
                 all_changes[key] = changes
                 self.has_new = True
 
+        # choose when to sync next time
+        self.schedule_sync(thread, lambda: self.scheduler.completed(self.has_new, thread.events))
+
         if self.has_new: # there are new events
             message = '<b>Shedule has been successfully updated</b><br>'
             for key, changes in all_changes.items():
                 month_num = int(key[-1:]) if key[4] == '0' else int(key[-2:])
                 message += '<br>{} {}<br>'.format(calendar.month_name[month_num], key[:4])
                 message += '<br>'.join(changes) 
-        elif self.thread.events: # there are old events only
+        elif thread.events: # there are old events only
             message = 'Shedule is up to date'
         else: # shedule is empty
             message = 'Shedule on the server is empty'
@@ -232,12 +315,15 @@ class TrayIcon(QtWidgets.QSystemTrayIcon):
         self.show_message(message, QtWidgets.QMessageBox.Information)
         
 
-    @QtCore.pyqtSlot('QDateTime', str)
+    @QtCore.pyqtSlot(str)
     def on_sync_failure(self, msg):
 
         """
         Called when sinchronization failed.
 
         """
+        thread = self.take_thread()
+        self.failed_sync = thread.synchronizer
+        self.schedule_sync(thread, self.scheduler.failed)
         message = 'An error has occurred when updating:\n' + msg
         self.show_message(message, QtWidgets.QMessageBox.Critical)
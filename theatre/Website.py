@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+
+from http import client
+from http.client import HTTPConnection
+from datetime import datetime
+import os
+import re
+import hashlib
+import socket
+import threading
+import time
+
+from easyhtml.parser import DOMParser
+from theatre.Store import Event
+
+# downloading and parsing of the shedule do not depend on Qt,
+# the sync thread of the application is in theatre.Sync
+
+# host for synchronization, it can be changed
+# to a local server for testing
+HOST = os.environ.get('THEATRE_SYNC_HOST', 'www.operetta.kharkiv.ua')
+
+CONNECT_TIMEOUT = 10 # seconds to connect to the host
+READ_TIMEOUT = 30 # seconds to wait for data of a page
+SYNC_DEADLINE = 300 # seconds for the whole synchronization
+RETRIES = 3 # attempts to download a page after a failure
+RETRY_DELAY = 2 # seconds before the first retry, it doubles each time
+CHECKPOINT_AGE = 3600 # seconds a failed sync can be continued
+
+# network error class
+class NetworkError(Exception): pass
+
+# synchronization has been cancelled or it took too long
+class SyncCancelled(NetworkError): pass
+
+class ServerError(NetworkError):
+
+    """
+    The server has responded with an error status.
+
+    """
+    def __init__(self, status, reason):
+        NetworkError.__init__(self, reason)
+        self.status = status
+
+class Downloader:
+
+    """
+    Gets data from the server. The connection is waited for
+    connect_timeout seconds, the response and each part of data
+    are waited for read_timeout seconds.
+
+    """
+    def __init__(self, url, connect_timeout=None, read_timeout=None, host=None):
+        self.connection = HTTPConnection(host or HOST, timeout=connect_timeout)
+        try:
+            # connect to host and send request
+            self.connection.connect()
+            self.connection.sock.settimeout(read_timeout)
+            self.connection.request('GET', url)
+        except:
+            # a connection error has occurred
+            self.close()
+            raise NetworkError('Network or server is unavailable')
+        # the response is waited when it is needed,
+        # so the request can be closed from another thread
+        self._response = None
+
+    @property
+    def response(self):
+
+        """
+        HTTP response
+
+        """
+        if self._response is None:
+            try:
+                # get server response
+                self._response = self.connection.getresponse()
+            except:
+                # a download error has occurred
+                self.close()
+                raise NetworkError('Could not get server response')
+        return self._response
+
+    def close(self):
+
+        """
+        Closes the connection, a blocked read fails at once.
+
+        """
+        sock = self.connection.sock
+        if sock is not None:
+            try:
+                # wake up a read waiting in another thread
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass # the connection is closed already
+        self.connection.close()
+
+    @property
+    def status(self):
+
+        """
+        HTTP response status
+
+        """
+        return self.response.status
+
+    @property
+    def reason(self):
+
+        """
+        HTTP response reason
+
+        """
+        return self.response.reason
+
+    @property
+    def data(self):
+
+        """
+        HTTP response data
+
+        """
+        try:
+            return self.response.read()
+        except:
+            # the server has stalled or the connection has been closed
+            raise NetworkError('Could not download data')
+        finally:
+            self.close()
+
+
+class Parser:
+
+    """
+    Parses downloaded data (html page).
+
+    """
+    # a dictionary for translating months' names to numbers
+    month_names = { 'января':   1,
+                    'февраля':  2,
+                    'марта':    3,
+                    'апреля':   4,
+                    'мая':      5,
+                    'июня':     6,
+                    'июля':     7,
+                    'августа':  8,
+                    'сентября': 9,
+                    'октября': 10,
+                    'ноября':  11,
+                    'декабря': 12   }
+
+    def __init__(self, data, now=None):
+        # create HTML parser
+        parser = DOMParser()
+        parser.feed(data)
+        # get DOM of the page
+        self.document = parser.get_dom()
+        # the next page is not yet known
+        self.forward = None
+        # when the page has been downloaded, years of events depend on it
+        self.now = now or datetime.now()
+        # a number of articles that could not be parsed
+        self.skipped = 0
+
+    def parse(self):
+
+        """
+        Parses the shedule table data
+        and returns found data for events.
+
+        """
+        # a list of events data
+        raw_events = []
+        # there is <article class="post"> object for each event
+        for article in self.document.article('class=post'):
+            # get all <span> objects in the <article>
+            spans = article.span
+            try:
+                # the first <span> contains a weekday
+                # and a time of the event separated by spaces
+                time = re.split('\s+', str(spans[0]))[1]
+                # the second <span> contains a day
+                day = str(spans[1])
+                # the third <span> contains a name of a month
+                # written with russian letters in upper case
+                # get its number from the dictionary month_names
+                month = self.month_names[str(spans[2]).lower()]
+
+                # assume that a year of the event
+                # is the current year
+                year = self.now.year
+                # if a month of the event has
+                # lesser number than the current month
+                if month < self.now.month:
+                    year += 1 # it belongs to the next year
+
+                # month_id is a string YYYYMM
+                month_id = '{0}{1:0>2}'.format(year, month)
+                # create a datetime object from the string YYYY.MM.DD HH:MM
+                date = datetime.strptime("{0}.{1:0>2}.{2:0>2} {3}".format(year, month, day, time), "%Y.%m.%d %H:%M")
+
+                try:
+                    # get all <p> objects
+                    paragraphs = article.p
+                    # a title of the event is a 'title' attribute
+                    # of an <a> object in the second <p> object
+                    #links = paragraphs.get_element(1).a
+                    #title = links.get_element(0).get_attr('title')
+                    links = paragraphs[2].a
+                    title = str(links[0])
+                    # if the link text is empty
+                    if not title:
+                        raise Exception
+                except:
+                    # if structure differs then an error has occured
+                    # in this case use seventh <span> object as a title
+                    title = str(spans[7])
+
+                # add an event data to the list after
+                # removing all space symbols around the title string
+                raw_events.append((month_id, date, title.strip(' \n\t\xA0')))
+            except:
+                # if there was something wrong - skip this <article>
+                self.skipped += 1
+                continue
+
+        # after processing all <article> objects
+        # get a link to the next page
+        try:
+            # get a <div class="pager"> objects
+            pagers = self.document.div('class=pager')
+            # it should be only one so if it exists
+            # get it from the list with index 0
+            pager = pagers[0]
+            # get a link to the next page with title "Вперёд"
+            links = pager.get_children('title=Вперёд')
+            # get 'href' attribute of the first link
+            url = links[0].get_attr('href')
+            # 'href' is separated by = and the second part
+            # is a number of starting event on the next page
+            next_id = url.split('=')[1]
+            # save it in 'forward' variable
+            self.forward = int(next_id)
+        except:
+            # if there was something wrong -
+            # assume that there is no next page
+            self.forward = None
+
+        # return a list of events data
+        return raw_events
+
+
+
+class Synchronizer:
+
+    """
+    Downloads all pages of the shedule and collects events.
+    It does not depend on Qt, so it can run in any thread
+    or without an application object at all.
+
+    first and last are optional keys (YYYYMM) of a window of months.
+    Only events of these months are collected and pages are not
+    downloaded after the window, the shedule is sorted by dates.
+
+    The whole synchronization takes no longer than deadline seconds.
+    It can be cancelled from another thread by cancel method.
+    A failed page is requested again up to retries times.
+    Downloaded pages are saved to the archive if it is given.
+
+    """
+    url = '/rus/?start={}'
+
+    def __init__(self, first=None, last=None, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, deadline=SYNC_DEADLINE,
+                 retries=RETRIES, retry_delay=RETRY_DELAY, archive=None, host=None):
+        self.events = {} # a dictionary events data
+        self.host = host # HOST is used by default
+        self.skipped = 0 # a number of articles that could not be parsed
+        self.archive = archive # an optional archive of downloaded pages
+        self.sync_id = None # a name of the sync in the archive
+        self.hashes = set() # hashsums of collected events
+        self.start = 0 # the offset of the next page
+        self.checkpointed = None # when the last page has been processed
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.first = first
+        self.last = last
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.started = None # when run has been called
+        self.cancelled = threading.Event()
+        self.downloader = None # the current request
+
+    def cancel(self):
+
+        """
+        Stops synchronization, run raises SyncCancelled.
+
+        """
+        self.cancelled.set()
+        downloader = self.downloader
+        if downloader is not None:
+            downloader.close() # interrupt waiting for the server
+
+    def remaining(self):
+
+        """
+        Returns seconds left before the deadline.
+        Raises SyncCancelled if nothing is left or sync is cancelled.
+
+        """
+        if self.cancelled.is_set():
+            raise SyncCancelled('Synchronization has been cancelled')
+        left = self.deadline - (time.monotonic() - self.started)
+        if left < 0.1: # too little for a request
+            raise SyncCancelled('Synchronization took too long')
+        return left
+
+    def is_expired(self):
+
+        """
+        Returns True if synchronization runs longer than it may,
+        waiting for the last response included.
+
+        """
+        return self.started is not None and \
+               time.monotonic() - self.started > self.deadline + self.read_timeout
+
+    def is_full(self):
+
+        """
+        Returns True if all months are synchronized.
+
+        """
+        return self.first is None and self.last is None
+
+    def in_window(self, month_id):
+
+        """
+        Returns True if the month is synchronized.
+
+        """
+        return (self.first is None or month_id >= self.first) and \
+               (self.last is None or month_id <= self.last)
+
+    def resume(self, other):
+
+        """
+        Continues the failed synchronization from its checkpoint:
+        takes events of its downloaded pages and the offset
+        of the next page. Returns True if it has been resumed.
+
+        """
+        if (other.first, other.last) != (self.first, self.last) or not other.start:
+            return False
+        # the shedule on the server changes, old pages are not trusted
+        if time.monotonic() - other.checkpointed > CHECKPOINT_AGE:
+            return False
+        self.events = other.events
+        self.hashes = other.hashes
+        self.skipped = other.skipped
+        self.sync_id = other.sync_id
+        self.start = other.start
+        self.checkpointed = other.checkpointed
+        return True
+
+    def download(self, url):
+
+        """
+        Returns the decoded page. Raises NetworkError
+        if the page can't be downloaded.
+
+        """
+        # no request may outlast the deadline
+        left = self.remaining()
+        self.downloader = Downloader(url, min(self.connect_timeout, left), min(self.read_timeout, left), self.host)
+        try:
+            if self.downloader.status != client.OK:
+                # a HTTP error has occurred
+                raise ServerError(self.downloader.status, self.downloader.reason)
+            return self.downloader.data.decode('utf-8') # get data
+        except NetworkError:
+            self.remaining() # report cancellation instead of a broken connection
+            raise
+        finally:
+            self.downloader.close()
+            self.downloader = None
+
+    def download_page(self, url):
+
+        """
+        Downloads the page, retries failed requests
+        after growing delays.
+
+        """
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            try:
+                return self.download(url)
+            except SyncCancelled:
+                raise
+            except ServerError as e:
+                if e.status < 500 or attempt == self.retries:
+                    raise # the page will not appear by itself
+            except NetworkError:
+                if attempt == self.retries:
+                    raise
+            # wait before the next attempt, it can be cancelled
+            self.cancelled.wait(min(delay, self.remaining()))
+            delay *= 2
+
+    def run(self):
+
+        """
+        Downloads the shedule. Found events are saved in self.events
+        as a dictionary YYYYMM -> a list of events.
+        Raises NetworkError if the shedule can't be downloaded.
+
+        After a failure self.start is the offset of the first page
+        that has not been downloaded, run can be called again
+        to continue synchronization.
+
+        """
+        self.started = time.monotonic()
+        if self.sync_id is None:
+            # pages of the sync are archived together
+            self.sync_id = datetime.now().strftime('%Y%m%dT%H%M%S.%f')
+        while True:
+            url = self.url.format(self.start)
+            data = self.download_page(url)
+            if self.archive is not None:
+                self.archive.put(self.sync_id, url, data, self.first, self.last)
+            parser = Parser(data)
+            if not self.collect(parser):
+                if self.archive is not None:
+                    # downloaded months are complete
+                    self.archive.complete(self.sync_id)
+                return self.events
+
+            # the page has been processed, remember where to continue
+            self.start = parser.forward
+            self.checkpointed = time.monotonic()
+
+    def collect(self, parser):
+
+        """
+        Adds events of the parsed page to self.events.
+        Returns True if the next page should be processed.
+
+        """
+        # parse events
+        raw_events = parser.parse()
+        self.skipped += parser.skipped
+
+        # create an Event object for each item
+        for raw_event in raw_events:
+            month_id = raw_event[0]
+            if not self.in_window(month_id):
+                continue
+            raw_str = raw_event[1].strftime('%Y.%m.%d %H:%M') + raw_event[2]
+            m = hashlib.md5(raw_str.encode())
+            hashsum = m.digest()
+            # the event may be on two pages if the shedule
+            # has changed between requests
+            if hashsum in self.hashes:
+                continue
+            self.hashes.add(hashsum)
+            event = Event(raw_event[1], raw_event[2], hashsum=hashsum)
+            # add event to existing list
+            if month_id in self.events:
+                self.events[month_id].append(event)
+            else: # or create a new list
+                self.events[month_id] = [event]
+
+        # last page of shedule
+        if parser.forward is None:
+            return False
+        # the next pages are after the window
+        if self.last is not None and raw_events and max(raw_event[0] for raw_event in raw_events) > self.last:
+            return False
+        return True